@@ -0,0 +1,267 @@
+'''
+Benchmarks for the bind/fmap/app/then hot paths of every monad, and for
+the interpreter in examples/reader.py.
+
+Run from the root directory:
+
+    python benchmarks/bench.py run -o results.json
+    python benchmarks/bench.py compare old.json results.json
+
+~run~ measures ops/sec (chain steps per second) and peak memory for
+chains of increasing length. ~compare~ flags workloads that got slower
+(or use more memory) by more than a threshold, and exits with status 1 if
+any did.
+'''
+import argparse
+import fnmatch
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'examples'))
+
+from monad.identity import Identity
+from monad.maybe import Maybe
+from monad.either import Either
+from monad.list import List
+from monad.reader import Reader
+from monad.state import State
+from monad.rws import RWS
+from monad.writer import Writer
+from monad.io import IO
+from monad.aio import AsyncIO
+from monad.cont import Cont
+
+import reader as interpreter
+
+MONADS = {
+    'Identity': (Identity.lift, lambda m: m.get()),
+    'Maybe': (Maybe.lift, lambda m: m.x),
+    'Either': (Either.lift, lambda m: m.get()),
+    'List': (List.lift, lambda m: m.get()),
+    'Reader': (Reader.lift, lambda m: m.run(None)),
+    'State': (State.lift, lambda m: m.run(0)),
+    'RWS': (RWS.lift, lambda m: m.run(None, 0)),
+    'Writer': (Writer.lift, lambda m: m.run()),
+    'IO': (IO.lift, lambda m: m.run()),
+    'AsyncIO': (AsyncIO.lift, lambda m: m.run()),
+    'Cont': (Cont.lift, lambda m: m.run()),
+}
+'''
+name -> (lift, run) for each monad
+'''
+
+def inc(x):
+    return x + 1
+
+def bind_chain(lift, run):
+    k = lambda x: lift(x + 1)
+    def workload(n):
+        m = lift(0)
+        for _ in range(n):
+            m = m.bind(k)
+        return run(m)
+    return workload
+
+def fmap_chain(lift, run):
+    def workload(n):
+        m = lift(0)
+        for _ in range(n):
+            m = m.fmap(inc)
+        return run(m)
+    return workload
+
+def app_chain(lift, run):
+    def workload(n):
+        m = lift(0)
+        f = lift(inc)
+        for _ in range(n):
+            m = f.app(m)
+        return run(m)
+    return workload
+
+def then_chain(lift, run):
+    def workload(n):
+        m = lift(0)
+        for i in range(n):
+            m = m.then(lift(i))
+        return run(m)
+    return workload
+
+def writer_tell_chain(n):
+    m = Writer.lift(0)
+    for i in range(n):
+        m = m.then(Writer.tell([i]))
+    return m.run()
+
+SQRT_PROGRAM = interpreter.Let(interpreter.Sym('x'), interpreter.Lit(5),
+    interpreter.Let(interpreter.Sym('y'), interpreter.Lit(2),
+        interpreter.Let(interpreter.Sym('squaredSum'),
+            interpreter.App(interpreter.App(interpreter.Sym('+'),
+                interpreter.App(interpreter.App(interpreter.Sym('*'), interpreter.Sym('x')), interpreter.Sym('x'))),
+                interpreter.App(interpreter.App(interpreter.Sym('*'), interpreter.Sym('y')), interpreter.Sym('y'))),
+            interpreter.App(interpreter.Sym('sqrt'), interpreter.Sym('squaredSum')))))
+
+def interpreter_eval(n):
+    '''
+    Evaluates (and runs) a small program n times
+    '''
+    for _ in range(n):
+        SQRT_PROGRAM.eval().run(interpreter.DEFAULT_ENVIRONMENT)
+
+def interpreter_compiled(n):
+    '''
+    Compiles a small program once and runs it n times
+    '''
+    compiled = SQRT_PROGRAM.compile()
+    for _ in range(n):
+        compiled.run(interpreter.DEFAULT_ENVIRONMENT)
+
+def interpreter_environment(n):
+    '''
+    Extends an environment with n bindings, then looks each one up
+    '''
+    env = interpreter.DEFAULT_ENVIRONMENT
+    syms = [interpreter.Sym('v%d' % i) for i in range(n)]
+    for sym in syms:
+        env = env.extend(sym, sym)
+    for sym in syms:
+        env.lookup(sym.name)
+
+def workloads():
+    '''
+    name -> (workload, max length). Each workload does n steps of work.
+    '''
+    ws = {}
+    for name, (lift, run) in MONADS.items():
+        ws[name + '.bind'] = (bind_chain(lift, run), None)
+        ws[name + '.fmap'] = (fmap_chain(lift, run), None)
+        ws[name + '.app'] = (app_chain(lift, run), None)
+        ws[name + '.then'] = (then_chain(lift, run), None)
+    ws['Writer.tell'] = (writer_tell_chain, None)
+    ws['interpreter.eval'] = (interpreter_eval, 10**5)
+    ws['interpreter.compiled'] = (interpreter_compiled, 10**5)
+    ws['interpreter.environment'] = (interpreter_environment, None)
+    return ws
+
+def time_workload(workload, n, min_time):
+    '''
+    Best time (in seconds) of running workload(n), repeated for at least min_time.
+    '''
+    best = math.inf
+    total = 0
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while total < min_time or best == math.inf:
+            start = time.perf_counter()
+            workload(n)
+            elapsed = time.perf_counter() - start
+            best = min(best, elapsed)
+            total += elapsed
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+def peak_memory(workload, n):
+    '''
+    Peak memory (in bytes) allocated while running workload(n).
+    '''
+    gc.collect()
+    tracemalloc.start()
+    try:
+        workload(n)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run(args):
+    lengths = [10**i for i in range(1, int(math.log10(args.max_length)) + 1)]
+    results = {}
+    for name, (workload, max_length) in workloads().items():
+        if args.only and not any(fnmatch.fnmatch(name, p) for p in args.only):
+            continue
+        results[name] = {}
+        for n in lengths:
+            if max_length and n > max_length:
+                break
+            seconds = time_workload(workload, n, args.min_time)
+            peak = peak_memory(workload, n)
+            results[name][str(n)] = {
+                'seconds': seconds,
+                'ops_per_sec': n / seconds,
+                'peak_bytes': peak,
+            }
+            print('%-26s n=%-8d %14.0f ops/sec %12d bytes' % (name, n, n / seconds, peak))
+            sys.stdout.flush()
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+def compare(args):
+    with open(args.old) as f:
+        old = json.load(f)['results']
+    with open(args.new) as f:
+        new = json.load(f)['results']
+    regressions = 0
+    for name in sorted(set(old) & set(new)):
+        for n in sorted(set(old[name]) & set(new[name]), key=int):
+            a, b = old[name][n], new[name][n]
+            speed = b['ops_per_sec'] / a['ops_per_sec'] - 1
+            memory = b['peak_bytes'] / max(a['peak_bytes'], 1) - 1
+            flags = []
+            if speed < -args.threshold:
+                flags.append('SLOWER')
+            if memory > args.threshold:
+                flags.append('MORE MEMORY')
+            regressions += bool(flags)
+            print('%-26s n=%-8s %+7.1f%% ops/sec %+7.1f%% memory %s'
+                  % (name, n, speed * 100, memory * 100, ' '.join(flags)))
+    print('%d regression(s) beyond %.0f%%' % (regressions, args.threshold * 100))
+    return 1 if regressions else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks for the monad package')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('-o', '--output', help='write the results as JSON to this file')
+    run_parser.add_argument('--max-length', type=int, default=10**6,
+                            help='longest chain to measure (default 10^6)')
+    run_parser.add_argument('--min-time', type=float, default=0.2,
+                            help='minimum seconds to spend timing each chain length')
+    run_parser.add_argument('--only', action='append',
+                            help='only run workloads matching this glob (e.g. "State.*")')
+    run_parser.set_defaults(f=run)
+
+    compare_parser = commands.add_parser('compare', help='compare two JSON results')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='relative change to flag (default 0.1 = 10%%)')
+    compare_parser.set_defaults(f=compare)
+
+    args = parser.parse_args(argv)
+    return args.f(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
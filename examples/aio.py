@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+from monad.aio import AsyncIO, run_aio, gather, aio_await, aio_sleep, aio_blocking, from_io
+from monad.io import IO
+
+def handshake():
+    '''
+    Two actions that each wait for the other one: they only finish if they
+    run concurrently.
+    '''
+    ready = {}
+    async def side(mine, theirs):
+        ready.setdefault(mine, asyncio.Event()).set()
+        await ready.setdefault(theirs, asyncio.Event()).wait()
+        return mine
+    return aio_await(side, 'a', 'b'), aio_await(side, 'b', 'a')
+
+if __name__ == '__main__':
+    assert AsyncIO.lift(3).fmap(lambda x: x + 1).run() == 4
+
+    # gather and app run their actions concurrently
+    a, b = handshake()
+    assert gather(a, b).run() == ('a', 'b')
+    a, b = handshake()
+    assert a.fmap(lambda x: lambda y: x + y).app(b).run() == 'ab'
+
+    start = time.perf_counter()
+    assert gather(aio_sleep(0.2, 1), aio_sleep(0.2, 2), aio_sleep(0.2, 3)).run() == (1, 2, 3)
+    assert time.perf_counter() - start < 0.5
+
+    # blocking functions and IO programs run in a worker thread
+    assert gather(aio_blocking(time.sleep, 0.2), from_io(IO.lift(5))).fmap(lambda t: t[1]).run() == 5
+
+    # inside a running event loop, await run_aio instead of calling run()
+    async def main():
+        return await run_aio(aio_sleep(0.01, 'x').bind(lambda x: AsyncIO.lift(x * 2)))
+    assert asyncio.run(main()) == 'xx'
+
+    # long chains of binds don't grow the Python stack
+    m = AsyncIO.lift(0)
+    for _ in range(100000):
+        m = m.bind(lambda x: AsyncIO.lift(x + 1))
+    assert m.run() == 100000
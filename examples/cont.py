@@ -1,56 +1,52 @@
-def plus(x, k):
-    k(x[0] + x[1])
-
-def div(x, k):
-    if x[1] == 0:
-        return print('Error: div by zero!')
-    else:
-        k(x[0] / x[1])
-
-# m a -> (a -> m b) -> m b
-# what does it mean to lift a value?
-
-
-class Cont:
-    def __init__(self, f):
-        self.f = f # (a -> r) -> r
-    
-    @staticmethod
-    def lift(x):
-        return Cont(lambda k: k(x))
-
-    def bind(self, f):
-        '''
-        Cont r a -> (a -> Cont r b) -> Cont r b
-        '''
-        return Cont(lambda k: )
-
-# Cont.lift(1 + 3).bind(lambda v: Cont.callCC(lambda k: k(v - 5)))
-    
-# When you run a continuation you have to flip it inside out.
-# because you evaluate inner expressions before outer
-
-# bind gives you the value (if it ever exists). You need to call "callCC" to get the current continuation. Sometimes there is no one listening to the continuation. But that's OK, callCC will still give you a continuation to call.
-
-# what is k?
-plus((1, 2), lambda x: \
-    div((1, x), lambda v: \
-        print(v)))
-
-a :: (Int, Int)
-plus :: a -> (a -> r) -> r
-# the "a" is the operands to add, the (a -> r) is the continuation (the computation above this one that is waiting on this value), the r at the end is the result of the computation that is waiting on this value
-div :: a -> (a -> r) -> r
-
-
-# how to combine?
-
-a -> ((b -> (b -> r) -> r) -> r)
-
-# data Cont r a = (a -> r) -> r
-# r is the return value of the continuation
-# a is the input value
-
-#if __name__ == '__main__':
-#    plus(3, -3, lambda x: div(3, x, lambda y: print('The answer is ', x)))
-
+from monad.cont import Cont
+
+def safe_div(n, d):
+    '''
+    Divides n by d, or exits early with an error message if d is zero.
+    '''
+    return Cont.callCC(lambda exit: \
+        (exit('Error: div by zero!') if d == 0 else Cont.lift(None)) \
+            .bind(lambda _: Cont.lift(n / d)))
+
+def plus(a, b):
+    return Cont.lift(a + b)
+
+if __name__ == '__main__':
+    assert Cont.lift(3).run() == 3
+    assert Cont.lift(3).run(lambda x: x * 2) == 6
+
+    assert plus(1, 2).bind(lambda x: safe_div(1, x)).run() == 1 / 3
+    assert plus(1, -1).bind(lambda x: safe_div(1, x)).run() == 'Error: div by zero!'
+
+    # A continuation made from a CPS function
+    twice = Cont(lambda k: k(k(1)))
+    assert twice.run(lambda x: x + 10) == 21
+
+    # Exiting early skips the rest of the computation inside callCC
+    seen = []
+    v = Cont.callCC(lambda k: k(1).bind(lambda _: Cont.lift(seen.append('not seen')))) \
+            .fmap(lambda x: x + 1).run()
+    assert v == 2 and seen == []
+
+    assert Cont.lift(lambda x: x + 2).app(Cont.lift(4)).run() == 6
+
+    # Long chains of binds run in constant stack space
+    m = Cont.lift(0)
+    for _ in range(100000):
+        m = m.bind(lambda x: Cont.lift(x + 1))
+    assert m.run() == 100000
+
+    # ...but each Cont(f) runs the rest of the program inside f, so it uses
+    # Python stack: a long loop should use lift instead
+    m = Cont.lift(0)
+    for _ in range(200):
+        m = m.bind(lambda x: Cont(lambda k: k(x + 1)))
+    assert m.run() == 200
+
+    # Escaping out of a deep chain is O(1)
+    def count_to(k, n):
+        m = Cont.lift(0)
+        for _ in range(n):
+            m = m.bind(lambda x: k('escaped') if x == 500 else Cont.lift(x + 1))
+        return m
+    assert Cont.callCC(lambda k: count_to(k, 100000)).run() == 'escaped'
@@ -0,0 +1,54 @@
+import numpy as np
+
+from monad.either import Left, Right
+from monad.either_array import EitherArray
+
+def validate_ages(ages):
+    '''
+    Checks a column of ages, row by row: each rule only sees the rows that
+    passed the rules before it.
+    '''
+    return ages \
+        .validate(lambda x: x >= 0, 'negative age') \
+        .validate(lambda x: x < 150, 'too old')
+
+if __name__ == '__main__':
+    ages = validate_ages(EitherArray(np.array([31, -4, 250, 47])))
+    values, errors = ages.partition()
+    assert values.tolist() == [31, 47]
+    assert errors.tolist() == ['negative age', 'too old']
+
+    # the same as Either, element by element
+    eithers = [Right(31), Left('missing'), Right(-4)]
+    checked = validate_ages(EitherArray.from_list(eithers)).to_list()
+    assert [type(e) for e in checked] == [Right, Left, Left]
+    assert [e.x for e in checked] == [31, 'missing', 'negative age']
+
+    # error codes and messages can be mixed without converting one to the other
+    mixed = EitherArray.from_list([Left('bad'), Right(5), Right(-1)]).validate(lambda x: x > 0, 404)
+    assert [e.x for e in mixed.to_list()] == ['bad', 5, 404]
+
+    # fmap and lift_a2 call their function once with all of the Right values
+    calls = []
+    def double(xs):
+        calls.append(len(xs))
+        return xs * 2
+    assert [e.x for e in ages.fmap(double).to_list() if isinstance(e, Right)] == [62, 94]
+    assert calls == [2]
+    total = EitherArray.lift_a2(np.add, ages, EitherArray(np.array([1, 2, 3, 4])))
+    assert total.partition()[0].tolist() == [32, 51]
+
+    # app keeps the error of the left side when both sides are Left
+    fs = EitherArray.from_list([Left(1), Right(abs)])
+    xs = EitherArray.from_list([Left('x'), Right(-2)])
+    assert [e.x for e in fs.app(xs).to_list()] == [1, 2]
+
+    # bind can give a single lifted value, which is repeated; other lengths are rejected
+    rights = EitherArray.from_list([Right(1), Right(2)])
+    assert [e.x for e in rights.bind(lambda xs: EitherArray.lift(3)).to_list()] == [3, 3]
+    assert [e.x for e in ages.bind(lambda xs: EitherArray.lift(3)).to_list()] == [3, 'negative age', 'too old', 3]
+    try:
+        rights.bind(lambda xs: EitherArray(np.array([1, 2, 3])))
+        assert False
+    except ValueError:
+        pass
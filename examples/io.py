@@ -0,0 +1,91 @@
+import io
+import os
+import tempfile
+
+from monad.io import IO, io_open, io_write, io_close, io_flush, io_read_lines, io_read_chunks, io_fold, io_mmap
+
+class Recorder(io.StringIO):
+    '''
+    A file handle that keeps each write it is given
+    '''
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, x):
+        self.writes.append(x)
+        return super().write(x)
+
+def write_lines(handle, n):
+    m = IO.lift(None)
+    for i in range(n):
+        m = m.then(io_write(handle, '%d\n' % i))
+    return m
+
+if __name__ == '__main__':
+    # consecutive writes to the same handle are made as one write
+    h = Recorder()
+    write_lines(h, 1000).run()
+    assert h.getvalue() == ''.join('%d\n' % i for i in range(1000))
+    assert len(h.writes) == 1
+
+    # at most buffer_size characters are buffered (0 writes each one immediately)
+    h = Recorder()
+    write_lines(h, 1000).run(buffer_size=100)
+    assert len(h.writes) == 39 and h.getvalue() == ''.join('%d\n' % i for i in range(1000))
+    h = Recorder()
+    write_lines(h, 10).run(buffer_size=0)
+    assert len(h.writes) == 10
+
+    # writes to different handles stay in order
+    a, b = Recorder(), Recorder()
+    log = []
+    a.write = lambda x: log.append(('a', x))
+    b.write = lambda x: log.append(('b', x))
+    io_write(a, '1').then(io_write(a, '2')).then(io_write(b, '3')).then(io_write(a, '4')).run()
+    assert log == [('a', '12'), ('b', '3'), ('a', '4')]
+
+    # an error in the program isn't hidden by the final flush failing
+    h = Recorder()
+    def fail(_):
+        h.close()
+        raise KeyError('program error')
+    try:
+        io_write(h, 'x').bind(fail).run()
+        assert False
+    except KeyError:
+        pass
+
+    # io_flush writes the buffer before the program goes on
+    h = Recorder()
+    seen = io_write(h, 'x').then(io_flush(h)).bind(lambda _: IO.lift(h.getvalue()))
+    assert seen.run() == 'x'
+
+    # the buffer is written before a file is closed, and io_flush after a close is fine
+    path = os.path.join(tempfile.mkdtemp(), 'out.txt')
+    io_open(path, 'w').bind(lambda f: io_write(f, 'x').then(io_close(f))).then(io_flush()).run()
+    with open(path) as f:
+        assert f.read() == 'x'
+
+    # reading a file a line or chunk at a time, as steps of the program
+    with open(path, 'w') as f:
+        f.write(''.join('%d %s\n' % (i, 'ERROR' if i % 100 == 0 else 'ok') for i in range(1000)))
+    count_errors = io_open(path) \
+        .bind(lambda f: io_fold(io_read_lines(f), lambda n, line: n + ('ERROR' in line), 0) \
+              .bind(lambda n: io_close(f).then(IO.lift(n))))
+    assert count_errors.run() == 10
+    stripped = lambda f: io_read_lines(f).fmap(lambda lines: lines.fmap(str.strip))
+    assert io_open(path).bind(lambda f: io_fold(stripped(f), lambda n, line: n + line.endswith('ok'), 0)).run() == 990
+    size = io_open(path, 'rb').bind(lambda f: io_fold(io_read_chunks(f, 1000), lambda n, c: n + len(c), 0))
+    assert size.run() == os.path.getsize(path)
+    first = io_open(path).bind(lambda f: io_read_lines(f).fmap(lambda lines: lines.take(2).get()))
+    assert first.run() == ['0 ERROR\n', '1 ok\n']
+    assert io_open(path, 'rb').bind(lambda f: io_mmap(f, lambda view: view.tobytes().count(b'ERROR'))).run() == 10
+
+    # a LazyList of lines can't be read after its file is closed
+    lines = io_open(path).bind(lambda f: io_read_lines(f).bind(lambda ls: io_close(f).then(IO.lift(ls)))).run()
+    try:
+        lines.get()
+        assert False
+    except ValueError:
+        pass
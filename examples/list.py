@@ -1,6 +1,6 @@
 import math
 
-from monad.list import List
+from monad.list import List, LazyList
 from monad.either import Left, Right
 from either import safe_input_int
 
@@ -18,6 +18,24 @@ class Answer:
         return '%s^2 + %s^2 = %s^2' % (self.a, self.b, int(self.c) if self.is_integer else self.c)
 
 if __name__ == '__main__':
+    # A LazyList only computes the triangles that are asked for
+    triangles = LazyList(range(1, 10**9)).bind(lambda c: \
+                    LazyList(range(1, c)).bind(lambda b: \
+                        LazyList(range(1, b)) \
+                            .filter(lambda a: a*a + b*b == c*c) \
+                            .fmap(lambda a: (a, b, c))))
+    assert triangles.take(2).get() == [(3, 4, 5), (6, 8, 10)]
+
+    # long chains of fmap and bind don't grow the Python stack
+    m = LazyList(range(10**9))
+    for _ in range(100000):
+        m = m.fmap(lambda x: x + 1)
+    assert m.first().x == 100000
+    m = LazyList.lift(0)
+    for _ in range(5000):
+        m = m.bind(lambda x: LazyList([x + 1, x + 2]))
+    assert m.take(2).get() == [5000, 5001]
+
     v = safe_input_int('Enter a max triangle side length [10 - 1000]: ') \
         .bind(validate_max) \
         .bind(lambda max: \
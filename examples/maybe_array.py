@@ -0,0 +1,47 @@
+import numpy as np
+
+from monad.maybe import Just, Nothing
+from monad.maybe_array import MaybeArray
+
+def safe_sqrt(xs):
+    '''
+    The square roots of a column of numbers, Nothing for the negative ones
+    '''
+    return MaybeArray(np.sqrt(np.abs(xs)), xs >= 0)
+
+def safe_sqrt_one(x):
+    return Just(x ** 0.5) if x >= 0 else Nothing()
+
+if __name__ == '__main__':
+    maybes = [Just(4.0), Nothing(), Just(-1.0), Just(9.0)]
+    column = MaybeArray.from_list(maybes)
+    assert column.bind(safe_sqrt).from_maybe(0).tolist() == [2.0, 0.0, 0.0, 3.0]
+
+    # element by element, the same as Maybe
+    expected = [m.bind(safe_sqrt_one) for m in maybes]
+    got = column.bind(safe_sqrt).to_list()
+    assert [type(m) for m in got] == [type(m) for m in expected]
+    assert [m.x for m in got if isinstance(m, Just)] == [m.x for m in expected if isinstance(m, Just)]
+
+    # fmap calls its function once, with only the Just values
+    calls = []
+    def inc(xs):
+        calls.append(xs.tolist())
+        return xs + 1
+    assert column.fmap(inc).from_maybe(None).tolist() == [5.0, None, 0.0, 10.0]
+    assert calls == [[4.0, -1.0, 9.0]]
+
+    # a lifted function broadcasts against a column; lift_a2 combines two columns
+    assert MaybeArray.lift(np.negative).app(column).from_maybe(0).tolist() == [-4.0, 0.0, 1.0, -9.0]
+    other = MaybeArray(np.array([1.0, 2.0, 3.0, 4.0]), np.array([True, True, False, True]))
+    assert MaybeArray.lift_a2(np.add, column, other).from_maybe(0).tolist() == [5.0, 0.0, 0.0, 13.0]
+    assert MaybeArray.lift_a2(np.add, column, MaybeArray.lift(10.0)).from_maybe(0).tolist() == [14.0, 0.0, 9.0, 19.0]
+
+    # bind can give a single lifted value, which is repeated; other lengths are rejected
+    assert MaybeArray(np.array([1, 2])).bind(lambda xs: MaybeArray.lift(5)).from_maybe(0).tolist() == [5, 5]
+    assert column.bind(lambda xs: MaybeArray.lift(5)).from_maybe(0).tolist() == [5, 0, 5, 5]
+    try:
+        column.bind(lambda xs: MaybeArray(np.array([1, 2])))
+        assert False
+    except ValueError:
+        pass
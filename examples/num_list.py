@@ -0,0 +1,34 @@
+import numpy as np
+
+from monad.list import List
+from monad.num_list import NumList
+
+def add3(x):
+    return lambda y: lambda z: x * 100 + y * 10 + z
+
+if __name__ == '__main__':
+    # a curried function is applied to every combination, in List's order
+    xs, ys, zs = [1, 2], [3, 4, 5], [6, 7]
+    expected = List(xs).fmap(add3).app(List(ys)).app(List(zs)).get()
+    got = NumList(xs).fmap(add3).app(NumList(ys)).app(NumList(zs)).get()
+    assert got.tolist() == expected
+
+    # ...by broadcasting: the function is called once per argument, not per combination
+    calls = []
+    def times(x):
+        calls.append(x.shape)
+        return lambda y: x * y
+    assert len(NumList(np.arange(1000)).fmap(times).app(NumList(np.arange(1000)))) == 10 ** 6
+    assert calls == [(1000,)]
+
+    # an array of (vectorized) functions
+    fs = np.array([np.negative, np.square], dtype=object)
+    assert NumList(fs).app(NumList([1, 2, 3])).get().tolist() == [-1, -2, -3, 1, 4, 9]
+
+    # the functions of a grid can be taken out and used one by one
+    subtract = NumList([1, 2]).fmap(lambda x: lambda y: x - y)
+    assert [f(10) for f in subtract.get()] == [-9, -8]
+
+    assert NumList([1, 2, 3]).bind(lambda x: NumList([x, -x])).get().tolist() == \
+        List([1, 2, 3]).bind(lambda x: List([x, -x])).get()
+    assert NumList(range(10)).filter(lambda x: x % 2 == 0).strict().get() == [0, 2, 4, 6, 8]
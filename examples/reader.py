@@ -1,14 +1,31 @@
 import math
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 
 from monad.reader import *
 
-class Expr: pass
+class Expr:
+    def compile(self):
+        '''
+        Compiles the expression once into a Reader that can be run against many
+        environments. Let-bound symbols are resolved to slot indices at compile
+        time (de Bruijn style), so running it allocates no Readers per node.
+
+        Each node's ~code(scope)~ compiles it to a function (env, slots) -> Val.
+        ~scope~ holds the names of the enclosing Lets, the value of ~scope[i]~ is
+        kept in ~slots[i]~ at run time.
+        '''
+        code = self.code(())
+        return Reader(lambda env: code(env, []))
 class Unit(Expr):
     '''
     Indicates an empty value
     '''
     def eval(self):
         return Reader.lift(UnitVal())
+
+    def code(self, scope):
+        return lambda env, slots: UnitVal()
 class Lit(Expr):
     '''
     A literal value (number, string, etc...)
@@ -18,6 +35,10 @@ class Lit(Expr):
         
     def eval(self):
         return Reader.lift(LitVal(self.val))
+
+    def code(self, scope):
+        val = self.val
+        return lambda env, slots: LitVal(val)
 class Sym(Expr):
     '''
     A symbol (used as identifiers for functions)
@@ -27,6 +48,13 @@ class Sym(Expr):
         
     def eval(self):
         return Reader.ask().bind(lambda env: Reader.lift(env.lookup(self.name)))
+
+    def code(self, scope):
+        name = self.name
+        for i in reversed(range(len(scope))):
+            if scope[i] == name:
+                return lambda env, slots: slots[i]
+        return lambda env, slots: env.lookup(name)
 class App(Expr):
     '''
     Function application (curried)
@@ -40,6 +68,11 @@ class App(Expr):
             self.sym.eval().bind(lambda f: \
                 self.expr.eval().bind(lambda v: \
                                       Reader.lift(f(v))))
+
+    def code(self, scope):
+        f = self.sym.code(scope)
+        x = self.expr.code(scope)
+        return lambda env, slots: f(env, slots)(x(env, slots))
 class Let(Expr):
     '''
     Binds a name to a value, inside of the body
@@ -54,6 +87,16 @@ class Let(Expr):
             self.expr.eval().bind(lambda v: \
                 self.body.eval().local(lambda env: \
                     env.extend(self.sym, v)))
+
+    def code(self, scope):
+        expr = self.expr.code(scope)
+        body = self.body.code(scope + (self.sym.name,))
+        def let(env, slots):
+            slots.append(expr(env, slots))
+            v = body(env, slots)
+            slots.pop()
+            return v
+        return let
 class If(Expr):
     '''
     If predicate ~pred~ is truthy, evaluates ~then~ part, otherwise evaluates ~other~ part
@@ -68,6 +111,13 @@ class If(Expr):
                      .bind(lambda v: \
                         self.then.eval() if bool(v.val) else self.other.eval())
 
+    def code(self, scope):
+        pred = self.pred.code(scope)
+        then = self.then.code(scope)
+        other = self.other.code(scope)
+        return lambda env, slots: \
+            then(env, slots) if bool(pred(env, slots).val) else other(env, slots)
+
 class Val: pass
 class UnitVal(Val): pass
 class FnVal(Val):
@@ -85,18 +135,111 @@ class LitVal(Val):
         self.val = val
 
 class Environment:
-    def __init__(self, env=None):
-        self.env = env if env else []
+    '''
+    Pure lexical environment
+
+    The bindings are kept in a persistent hash trie (a HAMT), so ~extend~
+    and ~lookup~ are O(log n) and an extended environment shares all but a
+    few nodes with the one it came from.
+    '''
+    def __init__(self, env=None, root=None):
+        self.root = root
+        for sym, val in env or []:
+            self.root = _assoc(self.root, 0, _hash(sym.name), sym.name, val)
 
     def extend(self, name, val):
-        return Environment(self.env + [[name, val]])
+        return Environment(root=_assoc(self.root, 0, _hash(name.name), name.name, val))
 
     def lookup(self, name):
-        for sym, val in reversed(self.env):
-            if name == sym.name:
-                return val
+        h = _hash(name)
+        node = self.root
+        shift = 0
+        while node is not None:
+            t = type(node)
+            if t is _Leaf:
+                if node.key == name:
+                    return node.val
+                break
+            if t is _Collision:
+                for key, val in node.entries:
+                    if key == name:
+                        return val
+                break
+            bit = 1 << ((h >> shift) & _MASK)
+            if not node.bitmap & bit:
+                break
+            node = node.children[_popcount(node.bitmap & (bit - 1))]
+            shift += _BITS
         raise Exception('Symbol %s not found in environment' % name)
 
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+
+class _Leaf:
+    __slots__ = ('h', 'key', 'val')
+
+    def __init__(self, h, key, val):
+        self.h = h
+        self.key = key
+        self.val = val
+class _Collision:
+    '''
+    Bindings whose keys have the same hash
+    '''
+    __slots__ = ('h', 'entries')
+
+    def __init__(self, h, entries):
+        self.h = h
+        self.entries = entries
+class _Node:
+    '''
+    A trie node: bit i of ~bitmap~ is set if there is a child for the
+    5-bit hash chunk i, ~children~ only holds the children that exist.
+    '''
+    __slots__ = ('bitmap', 'children')
+
+    def __init__(self, bitmap, children):
+        self.bitmap = bitmap
+        self.children = children
+
+def _hash(key):
+    return hash(key) & 0xFFFFFFFFFFFFFFFF
+
+def _popcount(x):
+    return bin(x).count('1')
+
+def _assoc(node, shift, h, key, val):
+    '''
+    Returns a copy of the trie ~node~ (at depth ~shift~) with key bound to val.
+    Only the nodes on the path to the key are copied.
+    '''
+    if node is None:
+        return _Leaf(h, key, val)
+    t = type(node)
+    if t is _Leaf:
+        if node.key == key:
+            return _Leaf(h, key, val)
+        if node.h == h:
+            return _Collision(h, ((node.key, node.val), (key, val)))
+        return _assoc(_wrap(node, shift), shift, h, key, val)
+    if t is _Collision:
+        if node.h == h:
+            entries = tuple(e for e in node.entries if e[0] != key)
+            return _Collision(h, entries + ((key, val),))
+        return _assoc(_wrap(node, shift), shift, h, key, val)
+    bit = 1 << ((h >> shift) & _MASK)
+    i = _popcount(node.bitmap & (bit - 1))
+    children = node.children
+    if node.bitmap & bit:
+        child = _assoc(children[i], shift + _BITS, h, key, val)
+        return _Node(node.bitmap, children[:i] + (child,) + children[i + 1:])
+    return _Node(node.bitmap | bit, children[:i] + (_Leaf(h, key, val),) + children[i:])
+
+def _wrap(node, shift):
+    '''
+    Makes a trie node (at depth ~shift~) that only holds a leaf or collision.
+    '''
+    return _Node(1 << ((node.h >> shift) & _MASK), (node,))
 
 DEFAULT_ENVIRONMENT = Environment([
     [Sym('+'), lambda x: lambda y: LitVal(x.val + y.val)],
@@ -112,6 +255,18 @@ DEFAULT_ENVIRONMENT = Environment([
 The built-in library
 '''
 
+def add(x):
+    '''
+    Adds the environment to x (a module-level function, so readers using it can be pickled)
+    '''
+    return Reader.ask().fmap(x.__add__)
+
+def double(e):
+    return e * 2
+
+def run_reader(r, e):
+    return r.run(e)
+
 if __name__ == '__main__':
     v = Lit(32).eval().run(DEFAULT_ENVIRONMENT)
     assert v.val == 32
@@ -135,6 +290,15 @@ if __name__ == '__main__':
     v = Let(Sym('a'), Lit(98), Let(Sym('a'), Lit(203), Sym('a'))).eval().run(DEFAULT_ENVIRONMENT)
     assert v.val == 203
 
+    # Extending an environment doesn't change the original
+    env = DEFAULT_ENVIRONMENT
+    for i in range(5000):
+        env = env.extend(Sym('v%d' % i), LitVal(i))
+    assert env.lookup('v1234').val == 1234
+    assert env.extend(Sym('v1234'), LitVal(-1)).lookup('v1234').val == -1
+    assert env.lookup('v1234').val == 1234
+    assert Sym('v1234').eval().run(env).val == 1234
+
     # Solve for c in 5^2 + 2^2 = c^2
     p = Let(Sym('x'), Lit(5),
             Let(Sym('y'), Lit(2),
@@ -147,3 +311,28 @@ if __name__ == '__main__':
     # Make sure console printed the answer
     v = App(Sym('print'), p).eval().run(DEFAULT_ENVIRONMENT)
     assert isinstance(v, UnitVal) # side-effecting operations return Unit
+
+    # Compile once, run against many environments
+    compiled = p.compile()
+    assert compiled.run(DEFAULT_ENVIRONMENT).val == math.sqrt(5*5 + 2*2)
+    q = Let(Sym('a'), Lit(98),
+            Let(Sym('b'), If(Sym('flag'), Sym('a'), Lit(1)),
+                Let(Sym('a'), Lit(203), App(App(Sym('+'), Sym('a')), Sym('b'))))).compile()
+    assert q.run(DEFAULT_ENVIRONMENT.extend(Sym('flag'), LitVal(True))).val == 203 + 98
+    assert q.run(DEFAULT_ENVIRONMENT.extend(Sym('flag'), LitVal(False))).val == 203 + 1
+
+    # Long chains of binds run in constant stack space
+    r = Reader.lift(0)
+    for _ in range(100000):
+        r = r.bind(lambda x: Reader.ask().fmap(lambda e: x + e))
+    assert r.run(1) == 100000
+    assert Reader.ask().local(lambda e: e * 2).bind(lambda x: Reader.ask().fmap(lambda e: x + e)).run(3) == 9
+
+    # Readers can be pickled (however long they are) and run in another process
+    r = Reader.lift(0)
+    for _ in range(100000):
+        r = r.bind(add)
+    r = r.local(double)
+    assert pickle.loads(pickle.dumps(r)).run(1) == 200000
+    with ProcessPoolExecutor(2) as executor:
+        assert list(executor.map(run_reader, [r, r], [1, 2])) == [200000, 400000]
@@ -0,0 +1,46 @@
+from monad.rws import RWS
+
+def handle(request):
+    '''
+    Handles a request: reads the server's name from the config (the
+    environment), logs the request and counts it in the state.
+    '''
+    return RWS.ask().bind(lambda config: \
+        RWS.tell(['%s %s' % (config['name'], request)]) \
+        .then(RWS.modify(lambda count: count + 1)) \
+        .then(RWS.lift(request.upper())))
+
+def handle_all(requests):
+    m = RWS.lift([])
+    for request in requests:
+        m = m.bind(lambda done, r=request: handle(r).fmap(lambda x: done + [x]))
+    return m
+
+if __name__ == '__main__':
+    config = {'name': 'server'}
+    assert handle('get').run(config, 0) == ('GET', 1, ['server get'])
+    assert handle_all(['a', 'b']).local(lambda c: {'name': 'proxy'}).run(config, 10) == \
+        (['A', 'B'], 12, ['proxy a', 'proxy b'])
+
+    # listen and censor only see the output of their scope
+    v = RWS.tell(['start']).then(handle('x').listen()).run(config, 0)
+    assert v == (('X', ['server x']), 1, ['start', 'server x'])
+    v = RWS.tell(['start']).then(handle('x').censor(lambda w: [l.upper() for l in w])).run(config, 0)
+    assert v[2] == ['start', 'SERVER X']
+
+    # any monoid can be told, e.g. str (a scope with no output doesn't change it)
+    assert RWS.lift(1).listen().then(RWS.tell('ab')).run(None, 0)[2] == 'ab'
+    assert RWS.tell('ab').then(RWS.lift(1).censor(lambda w: w)).then(RWS.tell('cd')).run(None, 0)[2] == 'abcd'
+    assert RWS.lift(1).listens(len).run(None, 0) == ((1, 0), 0, [])
+
+    # a Writer's output can be sent to a sink too
+    from monad.writer import Writer
+    out = []
+    assert RWS.writer(Writer.tell(['a']).then(Writer.tell(['b']))).run(None, 0, out.extend)[2] == []
+    assert out == ['a', 'b']
+
+    # long chains of binds run in constant stack space
+    m = RWS.lift(0)
+    for _ in range(100000):
+        m = m.bind(lambda x: RWS.modify(lambda s: s + 1).then(RWS.lift(x + 1)))
+    assert m.run(None, 0) == (100000, 100000, [])
@@ -1,3 +1,6 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 from monad.state import State
 
 lift = lambda f: State.get().bind(lambda s: State.put(f(s)))
@@ -21,6 +24,21 @@ main = g.bind(lambda v: lift(lambda v: v + v))
 Increment the state using State monad ~g~, then add with itself.
 '''
 
+def add_one(s):
+    return s + 1
+
+def counter(n):
+    '''
+    A program made only of nodes and module-level functions, so it can be pickled
+    '''
+    m = State.lift(None)
+    for _ in range(n):
+        m = m.then(State.modify(add_one))
+    return m.then(State.gets(add_one))
+
+def run_program(m, s):
+    return m.run(s)
+
 if __name__ == '__main__':
     assert main.run(4)[1] == 10
     '''
@@ -34,3 +52,36 @@ if __name__ == '__main__':
         return s
     '''
     assert State.lift(lambda x: x + 1).app(State.lift(4)).run(0)[0] == 5
+
+    # Long chains of binds run in constant stack space
+    m = State.lift(None)
+    for _ in range(100000):
+        m = m.then(inc)
+    assert m.run(0)[1] == 100000
+
+    # Run the same program from many initial states
+    double = State.modify(lambda s: s * 2).then(State.gets(lambda s: s + 1))
+    assert list(double.run_many(range(4))) == [(1, 0), (3, 2), (5, 4), (7, 6)]
+    with ThreadPoolExecutor(2) as executor:
+        results = double.run_many(iter(range(10000)), executor, chunksize=100)
+        assert next(results) == (1, 0)
+        assert list(results)[-1] == (19999, 19998)
+
+    # In-place updates of a state that only exists inside run_st
+    count = State.lift(None)
+    for word in 'a b a c a'.split():
+        count = count.then(State.mutate(lambda s, w=word: s.update({w: s.get(w, 0) + 1})))
+    assert count.then(State.getitem('a')).run_st(dict) == 3
+    assert count.then(State.gets(dict)).run_st(dict) == {'a': 3, 'b': 1, 'c': 1} # a copy
+    for escapes in [lambda: count.run({}), lambda: count.then(State.get()).run_st(dict)]:
+        try:
+            escapes()
+            assert False
+        except RuntimeError:
+            pass
+
+    # Programs can be pickled (however long they are) and run in another process
+    deep = counter(100000)
+    assert pickle.loads(pickle.dumps(deep)).run(0) == (100001, 100000)
+    with ProcessPoolExecutor(2) as executor:
+        assert list(executor.map(run_program, [deep, deep], [0, 5])) == [(100001, 100000), (100006, 100005)]
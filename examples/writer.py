@@ -1,4 +1,5 @@
 from monad.writer import Writer
+from monad.unit import Unit
 
 class Expr: pass
 class Lit(Expr):
@@ -38,3 +39,52 @@ if __name__ == '__main__':
     v = Op(Sym('+'), Op(Sym('-'), Lit(1), Op(Sym('*'), Lit(2), Lit(8))), Lit(32)).gen().run()
     assert v[0] == '((1 - (2 * 8)) + 32)' # produces the correct output
     assert v[1] == 4 # it counted that there were 4 literals correctly
+
+
+    # any monoid works, e.g. str: a listen/censor with no output doesn't change its type
+    tell = Writer.tell
+    assert Writer.lift(1).censor(lambda w: w).bind(lambda _: tell('ab')).run()[1] == 'ab'
+    assert tell('ab').bind(lambda _: Writer.lift(1).listen()).bind(lambda _: tell('cd')).run()[1] == 'abcd'
+    assert tell('ab').then(tell('c').censor(str.upper)).listen().run()[0][1] == 'abC'
+    assert Writer.lift(1).listen().run() == ((1, []), [])
+    assert Writer.lift(1).listens(len).run() == ((1, 0), [])
+    assert Writer.lift(1).censor(lambda w: w + ['x']).run() == (1, ['x'])
+
+    # a StreamWriter gives its output to a sink in batches, as it runs
+    from monad.stream_writer import StreamWriter
+    batches = []
+    def count(i, n):
+        if i == n:
+            return StreamWriter.lift(n)
+        return StreamWriter.tell([i]).bind(lambda _: count(i + 1, n))
+    assert count(0, 5).run(batches.append, batch_size=2) == 5
+    assert batches == [[0, 1], [2, 3], [4]]
+
+    # inside a listen or censor the output is kept until the end of the scope
+    batches = []
+    sent = lambda: StreamWriter.lift(None).fmap(lambda _: sum(batches, []))
+    v = StreamWriter.tell(['a']) \
+        .then(StreamWriter.tell(['b']).then(sent()).censor(lambda w: [x.upper() for x in w])) \
+        .bind(lambda inside: sent().fmap(lambda after: (inside, after)))
+    assert v.run(batches.append, batch_size=1) == (['a'], ['a', 'B'])
+    assert StreamWriter.tell(['b']).listen().run(batches.append) == (Unit(), ['b'])
+
+    # numbers told in a StreamWriter can be accumulated by metrics (needs NumPy)
+    from monad.metrics import Metrics, Sum, Count, Min, Max, Histogram
+    timings = StreamWriter.tell([12.5, 3.0]).then(StreamWriter.tell([48.2, -1.0, 50.0]))
+    latency = Histogram(0, 50, 5)
+    _, m = timings.collect(Metrics(count=Count(), total=Sum(), fastest=Min(), slowest=Max(), latency=latency),
+                           batch_size=2)
+    assert (m['count'], m['total'], m['fastest'], m['slowest']) == (5, 112.7, -1.0, 50.0)
+    assert m['latency'].tolist() == [1, 1, 0, 0, 1]
+    assert (latency.underflow, latency.overflow) == (1, 1)
+    try:
+        latency.add([1.0]) # a metric is frozen once its result is taken
+        assert False
+    except ValueError:
+        pass
+    try:
+        StreamWriter.tell([float('nan')]).collect(Histogram(0, 1, 2))
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,201 @@
+import asyncio
+
+from .monad import Monad
+from .unit import Unit
+
+class AsyncIO(Monad):
+    '''
+    AsyncIO a
+
+    Like IO, an AsyncIO value is an inert description of an action, but its
+    primitives are coroutines run on an asyncio event loop. ~bind~ sequences
+    actions, while ~app~ and ~gather~ run independent actions concurrently.
+
+    ~run()~ runs a program with ~asyncio.run~. Inside of a running event loop
+    use ~await run_aio(program)~ instead.
+    '''
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+
+    @staticmethod
+    def lift(x):
+        return AsyncIO(x)
+
+    def bind(self, f):
+        '''
+        bind :: AsyncIO a -> (a -> AsyncIO b) -> AsyncIO b
+        '''
+        return AsyncIOBind(self, f)
+
+    def fmap(self, f):
+        '''
+        fmap :: AsyncIO a -> (a -> b) -> AsyncIO b
+        '''
+        return AsyncIOBind(self, lambda a: AsyncIO.lift(f(a)))
+
+    def app(self, other):
+        '''
+        app :: AsyncIO (a -> b) -> AsyncIO a -> AsyncIO b
+        Runs both actions concurrently.
+        '''
+        return gather(self, other).fmap(lambda t: t[0](t[1]))
+
+    def run(self):
+        '''
+        run :: AsyncIO a -> a
+        Runs the program on a new event loop (see ~run_aio~).
+        '''
+        return asyncio.run(run_aio(self))
+
+class AsyncIOAwait(AsyncIO):
+    '''
+    Awaits ~f(*args)~ (where f is a coroutine function).
+    '''
+    __slots__ = ('f', 'args')
+
+    def __init__(self, f, args):
+        self.f = f
+        self.args = args
+class AsyncIOGather(AsyncIO):
+    '''
+    Runs ~ms~ concurrently, and gives a tuple of their values.
+    '''
+    __slots__ = ('ms',)
+
+    def __init__(self, ms):
+        self.ms = ms
+class AsyncIOBind(AsyncIO):
+    '''
+    A suspended ~m.bind(f)~ -- interpreted by ~run_aio~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+async def _run_pure(m):
+    return m.x
+
+async def _run_await(m):
+    return await m.f(*m.args)
+
+async def _run_gather(m):
+    return tuple(await asyncio.gather(*[run_aio(m) for m in m.ms]))
+
+ASYNC_IO_PRIMITIVES = {
+    AsyncIO: _run_pure,
+    AsyncIOAwait: _run_await,
+    AsyncIOGather: _run_gather,
+}
+'''
+Maps each primitive AsyncIO action type to the coroutine function that performs it.
+'''
+
+async def run_aio(m):
+    '''
+    run_aio :: AsyncIO a -> a (a coroutine)
+    Interprets an AsyncIO program. Binds are walked in a loop (so long programs
+    don't grow the Python stack) and each primitive is performed through the
+    ~ASYNC_IO_PRIMITIVES~ dispatch table.
+    '''
+    primitives = ASYNC_IO_PRIMITIVES
+    konts = []
+    while True:
+        t = type(m)
+        if t is AsyncIOBind:
+            konts.append(m.f)
+            m = m.m
+            continue
+        a = await primitives[t](m)
+        if not konts:
+            return a
+        m = konts.pop()(a)
+
+def gather(*ms):
+    '''
+    gather :: AsyncIO a -> AsyncIO b -> ... -> AsyncIO (a, b, ...)
+    Runs the actions concurrently.
+    '''
+    return AsyncIOGather(ms)
+
+def aio_await(f, *args):
+    '''
+    aio_await :: (... -> Coroutine a) -> ... -> AsyncIO a
+    An action that awaits ~f(*args)~ each time it is run.
+    '''
+    return AsyncIOAwait(f, args)
+
+async def _in_thread(f, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, f, *args)
+
+def aio_blocking(f, *args):
+    '''
+    aio_blocking :: (... -> a) -> ... -> AsyncIO a
+    An action that calls the blocking function ~f(*args)~ in a worker thread,
+    so it doesn't stall the event loop.
+    '''
+    return AsyncIOAwait(_in_thread, (f,) + args)
+
+def _print(x):
+    print(x, end='')
+    return Unit()
+
+def _write(handle, x):
+    handle.write(x)
+    return Unit()
+
+def _close(handle):
+    handle.close()
+    return Unit()
+
+def aio_print(x):
+    '''
+    aio_print :: a -> AsyncIO ()
+    '''
+    return aio_blocking(_print, x)
+
+def aio_println(x):
+    '''
+    aio_println :: a -> AsyncIO ()
+    '''
+    return aio_blocking(_print, x + '\n')
+
+def aio_write(handle, x):
+    '''
+    aio_write :: Handle -> a -> AsyncIO ()
+    '''
+    return aio_blocking(_write, handle, x)
+
+def aio_close(handle):
+    '''
+    aio_close :: Handle -> AsyncIO ()
+    '''
+    return aio_blocking(_close, handle)
+
+def aio_input():
+    '''
+    aio_input :: AsyncIO String
+    '''
+    return aio_blocking(input)
+
+def aio_open(file_path, io_mode='r'):
+    '''
+    aio_open :: FilePath -> IOMode -> AsyncIO Handle
+    '''
+    return aio_blocking(open, file_path, io_mode)
+
+def aio_sleep(seconds, x=None):
+    '''
+    aio_sleep :: Float -> a -> AsyncIO a
+    '''
+    return AsyncIOAwait(asyncio.sleep, (seconds, x))
+
+def from_io(io):
+    '''
+    from_io :: IO a -> AsyncIO a
+    Runs a (blocking) IO program in a worker thread.
+    '''
+    return aio_blocking(io.run)
@@ -1,21 +1,119 @@
 from .monad import Monad
 
 class Cont(Monad):
+    '''
+    Cont r a
+    A computation that passes its result (an a) to a continuation (a -> r).
+
+    ~Cont(f)~ makes a continuation from a function f :: (a -> r) -> r.
+    ~lift~, ~bind~ and ~callCC~ are stored as data and ~run~ walks them in a
+    loop with an explicit stack of continuations, so chains of binds of any
+    length use constant Python stack, and jumping to a continuation captured
+    by ~callCC~ is O(1).
+
+    A ~Cont(f)~ is the exception: f is an ordinary function that needs the
+    final result r of the rest of the program, so the rest of the program runs
+    inside the call to f (using Python stack for each ~Cont(f)~ that is run).
+    In a long loop, use ~lift~ (~Cont.lift(x)~ instead of ~Cont(lambda k: k(x))~).
+    '''
+    __slots__ = ('f',)
+
+    def __init__(self, f):
+        self.f = f
+
     @staticmethod
     def lift(x):
-        pass
+        '''
+        lift :: a -> Cont r a
+        '''
+        return ContPure(x)
 
     def bind(self, f):
-        pass
+        '''
+        bind :: Cont r a -> (a -> Cont r b) -> Cont r b
+        '''
+        return ContBind(self, f)
+
+    def fmap(self, f):
+        '''
+        fmap :: Cont r a -> (a -> b) -> Cont r b
+        '''
+        return ContBind(self, lambda a: ContPure(f(a)))
+
+    def app(self, other):
+        '''
+        <*> :: Cont r (a -> b) -> Cont r a -> Cont r b
+        '''
+        return ContBind(self, lambda f: other.fmap(f))
+
+    @staticmethod
+    def callCC(f):
+        '''
+        callCC :: ((a -> Cont r b) -> Cont r a) -> Cont r a
+        Calls f with the current continuation k. Binding to ~k(x)~ anywhere inside
+        of f skips the rest of f, and continues after the ~callCC~ with value x.
+        '''
+        return CallCC(f)
+
+    def run(self, k=lambda x: x):
+        '''
+        run :: Cont r a -> (a -> r) -> r
+        Runs the continuation with k as the final continuation (identity by default).
+        '''
+        return _run(self, None, k)
+
+class ContPure(Cont):
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+class ContBind(Cont):
+    __slots__ = ('m',)
 
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+class CallCC(Cont):
+    __slots__ = ()
 
-def plus(a, b, k):
-    k(a + b)
+    def __init__(self, f):
+        self.f = f
+class ContJump(Cont):
+    '''
+    Continue with value ~x~ and the (captured) stack of continuations ~konts~.
+    '''
+    __slots__ = ('x', 'konts')
 
-def div(a, b, k):
-    if b == 0:
-        return 'Error'
-    else:
-        k(a / b)
+    def __init__(self, x, konts):
+        self.x = x
+        self.konts = konts
 
-div(3, 0, lambda x: print(x))
+def _run(m, konts, k):
+    '''
+    The continuations still to be run are kept in ~konts~, a linked list of
+    (a -> Cont r b, konts) tuples, so capturing them in callCC is O(1).
+    '''
+    while True:
+        t = type(m)
+        if t is ContBind:
+            konts = (m.f, konts)
+            m = m.m
+            continue
+        if t is ContPure:
+            a = m.x
+        elif t is CallCC:
+            captured = konts
+            m = m.f(lambda a: ContJump(a, captured))
+            continue
+        elif t is ContJump:
+            a = m.x
+            konts = m.konts
+        else:
+            # f needs the result of the rest of the program, so it is run here
+            # (recursively) rather than in this loop
+            rest = konts
+            return m.f(lambda a: _run(ContPure(a), rest, k))
+        if konts is None:
+            return k(a)
+        f, konts = konts
+        m = f(a)
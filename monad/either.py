@@ -1,6 +1,8 @@
 from .monad import Monad
 
 class Either(Monad):
+    __slots__ = ('x',)
+
     def __init__(self, x):
         self.x = x
         
@@ -32,6 +34,31 @@ class Either(Monad):
             return f(self.x)
         return self
 
+    @staticmethod
+    def traverse(f, xs, executor=None, chunksize=1):
+        '''
+        traverse :: (a -> Either e b) -> [a] -> Either e [b]
+        Applies f to each x, giving the first Left (in the order of xs) or a Right of
+        all the values. If an executor (e.g. a ~concurrent.futures.ProcessPoolExecutor~)
+        is given, f is applied in the executor (f and xs must be picklable for a
+        process pool). ~chunksize~ is passed to ~executor.map~.
+        '''
+        ms = map(f, xs) if executor is None else executor.map(f, xs, chunksize=chunksize)
+        return Either.sequence(ms)
+
+    @staticmethod
+    def sequence(ms):
+        '''
+        sequence :: [Either e a] -> Either e [a]
+        The first Left, or a Right of all the values.
+        '''
+        xs = []
+        for m in ms:
+            if isinstance(m, Left):
+                return m
+            xs.append(m.x)
+        return Right(xs)
+
     def get(self):
         '''
         Extracts the value from the monad
@@ -39,6 +66,8 @@ class Either(Monad):
         return self.x
     
 
-class Left(Either): pass
+class Left(Either):
+    __slots__ = ()
 
-class Right(Either): pass
+class Right(Either):
+    __slots__ = ()
@@ -0,0 +1,166 @@
+'''
+A column of Either values backed by NumPy (an optional dependency).
+'''
+import numpy as np
+
+from .monad import Monad
+from .either import Left, Right
+from .maybe_array import _scatter, _valid, _fit
+
+class EitherArray(Monad):
+    '''
+    EitherArray e a
+    An array of Either e a, stored as an array of values, an array of errors and a
+    boolean mask that is True where the row is a Right. The functions given to
+    ~fmap~ and ~bind~ are called once with an array of all of the Right values (so
+    they should be vectorized, like NumPy ufuncs); rows that are already Left are
+    skipped, like ~Either~ does element by element.
+
+    The errors can be any array, e.g. messages (an object array) or error codes.
+    Values of Left rows and errors of Right rows are undefined (zero-filled).
+    '''
+    __slots__ = ('values', 'errors', 'ok')
+
+    def __init__(self, values, ok=None, errors=None):
+        self.values = np.asarray(values)
+        self.ok = np.ones(self.values.shape[:1] if self.values.ndim else (), dtype=bool) \
+            if ok is None else np.asarray(ok, dtype=bool)
+        self.errors = np.zeros(self.ok.shape, dtype=object) if errors is None else np.asarray(errors)
+
+    @staticmethod
+    def lift(x):
+        '''
+        lift :: a -> EitherArray e a
+        A single Right (a 0-d EitherArray) that broadcasts against any other EitherArray.
+        '''
+        if np.isscalar(x):
+            return EitherArray(np.asarray(x), True)
+        values = np.empty((), dtype=object)
+        values[()] = x
+        return EitherArray(values, True)
+
+    @staticmethod
+    def from_list(es):
+        '''
+        from_list :: [Either e a] -> EitherArray e a
+        '''
+        ok = np.fromiter((isinstance(e, Right) for e in es), dtype=bool, count=len(es))
+        values = _scatter(ok, np.asarray([e.x for e in es if isinstance(e, Right)]))
+        errors = _scatter(~ok, np.asarray([e.x for e in es if isinstance(e, Left)]))
+        return EitherArray(values, ok, errors)
+
+    def to_list(self):
+        '''
+        to_list :: EitherArray e a -> [Either e a]
+        '''
+        return [Right(x) if ok else Left(e) for x, e, ok in
+                zip(self.values.tolist(), self.errors.tolist(), self.ok.tolist())]
+
+    def fmap(self, f):
+        '''
+        fmap :: EitherArray e a -> (Array a -> Array b) -> EitherArray e b
+        '''
+        if self.ok.all():
+            return EitherArray(f(self.values), self.ok, self.errors)
+        return EitherArray(_scatter(self.ok, f(self.values[self.ok])), self.ok, self.errors)
+
+    def bind(self, f):
+        '''
+        bind :: EitherArray e a -> (Array a -> EitherArray e b) -> EitherArray e b
+        f is given the Right values, and must give an EitherArray of the same length
+        (or a single one, from ~lift~, that is repeated).
+        '''
+        if self.ok.ndim == 0:
+            return f(self.values) if self.ok else self
+        every = self.ok.all()
+        valid = self.values if every else self.values[self.ok]
+        m = f(valid)
+        n = len(valid)
+        values, right, new = _fit(m.values, n), _fit(m.ok, n), _fit(m.errors, n)
+        if every:
+            return EitherArray(values, right, new)
+        ok = self.ok.copy()
+        ok[self.ok] = right
+        errors = _merge(self.errors, new)
+        errors[self.ok] = new
+        return EitherArray(_scatter(self.ok, values), ok, errors)
+
+    def validate(self, pred, error):
+        '''
+        validate :: EitherArray e a -> (Array a -> Array Bool) -> e -> EitherArray e a
+        Marks the Right rows where ~pred~ is False as Left ~error~ (a single error, or
+        a function from the array of failing values to an array of errors).
+        '''
+        def check(xs):
+            passed = np.asarray(pred(xs), dtype=bool)
+            failed = ~passed
+            errs = np.asarray(error(xs[failed]) if callable(error) else error)
+            errors = np.zeros(passed.shape, dtype=errs.dtype)
+            errors[failed] = errs
+            return EitherArray(xs, passed, errors)
+        return self.bind(check)
+
+    def app(self, other):
+        '''
+        <*> :: EitherArray e (a -> b) -> EitherArray e a -> EitherArray e b
+        If self is a single function (from ~lift~) it is called once with the array of
+        Right values in other. Otherwise each function is applied to its element.
+        A row that is Left on both sides keeps self's error (like ~Either.app~).
+        '''
+        if self.values.ndim == 0 and self.ok:
+            return other.fmap(self.values[()])
+        ok = self.ok & other.ok
+        valid = np.nonzero(ok)[0]
+        fs = np.broadcast_to(self.values, ok.shape)[valid]
+        xs = np.broadcast_to(other.values, ok.shape)[valid]
+        ys = np.empty(len(valid), dtype=object)
+        ys[:] = [f(x) for f, x in zip(fs, xs)]
+        errors = _where(self.ok, other.errors, self.errors)
+        return EitherArray(_scatter(ok, ys), ok, errors)
+
+    @staticmethod
+    def lift_a2(f, a, b):
+        '''
+        lift_a2 :: (Array a -> Array b -> Array c) -> EitherArray e a -> EitherArray e b -> EitherArray e c
+        Same as ~lift(curry(f)).app(a).app(b)~, but f is called once with the arrays of
+        values where both a and b are Right.
+        '''
+        ok = a.ok & b.ok
+        errors = _where(a.ok, b.errors, a.errors)
+        if ok.all():
+            return EitherArray(f(a.values, b.values), ok, errors)
+        return EitherArray(_scatter(ok, f(_valid(a, ok), _valid(b, ok))), ok, errors)
+
+    def partition(self):
+        '''
+        partition :: EitherArray e a -> (Array a, Array e)
+        The values of the Right rows and the errors of the Left rows (each in order).
+        '''
+        return (self.values[self.ok], self.errors[~self.ok])
+
+    def __len__(self):
+        return len(self.ok)
+
+def _merge(errors, new):
+    '''
+    A copy of errors with a dtype that can also hold the new errors
+    '''
+    return errors.astype(_error_dtype(errors, new))
+
+def _where(ok, errors, other):
+    '''
+    ~np.where(ok, errors, other)~, without converting errors of different kinds
+    '''
+    dtype = _error_dtype(errors, other)
+    return np.where(ok, errors.astype(dtype), other.astype(dtype))
+
+def _error_dtype(a, b):
+    '''
+    A dtype for both errors a and b. Numbers are promoted as usual, but errors of
+    different kinds (e.g. codes and messages) need an object array, so they
+    aren't converted (e.g. 404 to '404').
+    '''
+    kinds = (a.dtype.kind, b.dtype.kind)
+    if kinds[0] == kinds[1] or all(kind in 'biuf' for kind in kinds):
+        return np.result_type(a, b)
+    return np.dtype(object)
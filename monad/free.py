@@ -0,0 +1,231 @@
+'''
+A generic program representation that can be optimized using the monad
+laws, then interpreted against any of the monads.
+
+    p = Free.lift(3).fmap(inc).fmap(double).bind(lambda x: Free.embed(State.put(x)))
+    p.optimize().interpret(State).run(0)
+
+The optimizer applies:
+- fmap fusion: ~m.fmap(f).fmap(g)~ becomes one fmap of f then g
+- left identity: ~lift(x).bind(f)~ becomes ~f(x)~, and ~lift(f).app(lift(x))~
+  becomes ~lift(f(x))~
+- then flattening: chains of ~then~ become one sequence, and ~lift(x).then(m)~
+  becomes ~m~
+
+Left identity calls the functions given to ~bind~/~fmap~ while optimizing,
+so they should be pure (as the laws assume).
+'''
+from .monad import Monad
+
+class Free(Monad):
+    '''
+    Free m a
+    A program that can be interpreted as an ~m a~ for any monad m.
+    '''
+    __slots__ = ()
+
+    @staticmethod
+    def lift(x):
+        '''
+        lift :: a -> Free m a
+        '''
+        return FreePure(x)
+
+    @staticmethod
+    def embed(m):
+        '''
+        embed :: m a -> Free m a
+        Uses a value of the monad that the program will be interpreted as.
+        '''
+        return FreeEmbed(m)
+
+    def bind(self, f):
+        '''
+        bind :: Free m a -> (a -> Free m b) -> Free m b
+        '''
+        return FreeBind(self, f)
+
+    def fmap(self, f):
+        '''
+        fmap :: Free m a -> (a -> b) -> Free m b
+        '''
+        return FreeMap(self, [f])
+
+    def app(self, other):
+        '''
+        <*> :: Free m (a -> b) -> Free m a -> Free m b
+        '''
+        return FreeApp(self, other)
+
+    def then(self, other):
+        '''
+        then :: Free m a -> Free m b -> Free m b
+        '''
+        return FreeThen(self, other)
+
+    def optimize(self):
+        '''
+        optimize :: Free m a -> Free m a
+        '''
+        return optimize(self)
+
+    def interpret(self, monad):
+        '''
+        interpret :: Free m a -> m a
+        ~monad~ is the monad's class (e.g. State), its ~lift~ is used for ~Free.lift~.
+        '''
+        return interpret(self, monad)
+
+class FreePure(Free):
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+class FreeEmbed(Free):
+    __slots__ = ('m',)
+
+    def __init__(self, m):
+        self.m = m
+class FreeBind(Free):
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+class FreeMap(Free):
+    '''
+    ~m~ mapped over each function in ~fs~ (in order)
+    '''
+    __slots__ = ('m', 'fs')
+
+    def __init__(self, m, fs):
+        self.m = m
+        self.fs = fs
+class FreeApp(Free):
+    __slots__ = ('m', 'other')
+
+    def __init__(self, m, other):
+        self.m = m
+        self.other = other
+class FreeThen(Free):
+    __slots__ = ('m', 'other')
+
+    def __init__(self, m, other):
+        self.m = m
+        self.other = other
+class FreeSeq(Free):
+    '''
+    Runs each program in ~ms~ (in order), giving the value of the last one
+    '''
+    __slots__ = ('ms',)
+
+    def __init__(self, ms):
+        self.ms = ms
+
+_SPINE = (FreeBind, FreeMap, FreeApp, FreeThen)
+
+class Compose:
+    '''
+    Applies each function in ~fs~ in order (a fused fmap).
+    '''
+    __slots__ = ('fs',)
+
+    def __init__(self, fs):
+        self.fs = fs
+
+    def __call__(self, x):
+        for f in self.fs:
+            x = f(x)
+        return x
+
+def optimize(p):
+    '''
+    optimize :: Free m a -> Free m a
+    Rewrites the program using the monad laws (see the module's docstring).
+    The chain of binds/fmaps/apps/thens is walked in a loop, so long chains
+    don't grow the Python stack.
+    '''
+    spine = []
+    while type(p) in _SPINE:
+        spine.append(p)
+        p = p.m
+    if type(p) is FreeSeq:
+        acc = FreeSeq(list(p.ms))
+    else:
+        acc = p
+    for node in reversed(spine):
+        t = type(node)
+        pure = type(acc) is FreePure
+        if t is FreeMap:
+            if pure:
+                acc = FreePure(Compose(node.fs)(acc.x))
+            elif type(acc) is FreeMap:
+                acc.fs.extend(node.fs)
+            else:
+                acc = FreeMap(acc, list(node.fs))
+        elif t is FreeBind:
+            acc = optimize(node.f(acc.x)) if pure else FreeBind(acc, node.f)
+        elif t is FreeApp:
+            other = optimize(node.other)
+            if pure and type(other) is FreePure:
+                acc = FreePure(acc.x(other.x))
+            elif pure:
+                acc = FreeMap(other, [acc.x]) if type(other) is not FreeMap \
+                    else FreeMap(other.m, other.fs + [acc.x])
+            else:
+                acc = FreeApp(acc, other)
+        else:
+            other = optimize(node.other)
+            ms = other.ms if type(other) is FreeSeq else [other]
+            if pure:
+                acc = other
+            elif type(acc) is FreeSeq:
+                if type(acc.ms[-1]) is FreePure:
+                    acc.ms.pop()
+                acc.ms.extend(ms)
+            else:
+                acc = FreeSeq([acc] + ms)
+    return acc
+
+def interpret(p, monad):
+    '''
+    interpret :: Free m a -> m a
+    Builds the program as a value of ~monad~ (a class with a ~lift~, e.g. State).
+    '''
+    spine = []
+    while type(p) in _SPINE:
+        spine.append(p)
+        p = p.m
+    t = type(p)
+    if t is FreePure:
+        acc = monad.lift(p.x)
+    elif t is FreeEmbed:
+        acc = p.m
+    else:
+        acc = interpret(p.ms[0], monad)
+        for m in p.ms[1:]:
+            acc = acc.then(interpret(m, monad))
+    for node in reversed(spine):
+        t = type(node)
+        if t is FreeMap:
+            acc = acc.fmap(node.fs[0] if len(node.fs) == 1 else Compose(node.fs))
+        elif t is FreeBind:
+            acc = acc.bind(_Interpreted(node.f, monad))
+        elif t is FreeApp:
+            acc = acc.app(interpret(node.other, monad))
+        else:
+            acc = acc.then(interpret(node.other, monad))
+    return acc
+
+class _Interpreted:
+    '''
+    A bind's function, with its resulting program interpreted as ~monad~
+    '''
+    __slots__ = ('f', 'monad')
+
+    def __init__(self, f, monad):
+        self.f = f
+        self.monad = monad
+
+    def __call__(self, x):
+        return interpret(self.f(x), self.monad)
@@ -1,6 +1,8 @@
 from .monad import Monad
 
 class Identity(Monad):
+    __slots__ = ('x',)
+
     def __init__(self, x):
         self.x = x
 
@@ -1,10 +1,29 @@
+import mmap
+import os
+import sys
+
 from .monad import Monad
 from .unit import Unit
+from .list import LazyList
+
+BUFFER_SIZE = 8192
+'''
+The default number of characters (or bytes) of output ~run_io~ buffers
+'''
 
 class IO(Monad):
+    '''
+    IO a
+
+    An IO value is an inert description of an action. ~bind~, ~fmap~ and
+    ~then~ only build a program; nothing happens until ~run~ is called, and
+    the same program can be run any number of times.
+    '''
+    __slots__ = ('x',)
+
     def __init__(self, x):
         self.x = x
-    
+
     @staticmethod
     def lift(x):
         return IO(x)
@@ -13,50 +32,253 @@ class IO(Monad):
         '''
         bind :: IO a -> (a -> IO b) -> IO b
         '''
-        return f(self.run())
+        return IOBind(self, f)
 
     def fmap(self, f):
         '''
         fmap :: IO a -> (a -> b) -> IO b
         '''
-        return f(self.run())
+        return IOBind(self, lambda a: IO.lift(f(a)))
 
     def app(self, other):
         '''
         app :: IO (a -> b) -> IO a -> IO b
         '''
-        return IO.lift(self.run()(other.val()))
-
-    def run(self):
-        if isinstance(self, IOInput):
-            return input()
-        elif isinstance(self, IOOutput):
-            if not self.handle:
-                print(self.x, end='')
-            else:
-                self.handle.write(self.x)
-            return Unit()
-        elif isinstance(self, IOFile):
-            return open(self.file_path, self.io_mode)
-        elif isinstance(self, IOClose):
-            self.handle.close()
-            return Unit()
+        return IOBind(self, lambda f: other.fmap(f))
+
+    def run(self, buffer_size=BUFFER_SIZE):
+        '''
+        run :: IO a -> a
+        Performs the action (see ~run_io~).
+        '''
+        return run_io(self, buffer_size)
 
 class IOInput(IO):
+    __slots__ = ()
+
     def __init__(self):
         pass
 class IOOutput(IO):
+    __slots__ = ('handle',)
+
     def __init__(self, x, handle):
         self.x = x
         self.handle = handle
 class IOFile(IO):
+    __slots__ = ('file_path', 'io_mode')
+
     def __init__(self, file_path, io_mode):
         self.file_path = file_path
         self.io_mode = io_mode
 class IOClose(IO):
+    __slots__ = ('handle',)
+
+    def __init__(self, handle):
+        self.handle = handle
+class IOBind(IO):
+    '''
+    A suspended ~m.bind(f)~ -- interpreted by ~run_io~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+class IOReadLines(IO):
+    __slots__ = ('handle',)
+
+    def __init__(self, handle):
+        self.handle = handle
+class IOReadChunks(IO):
+    __slots__ = ('handle', 'size')
+
+    def __init__(self, handle, size):
+        self.handle = handle
+        self.size = size
+class IOFold(IO):
+    __slots__ = ('source', 'f', 'acc')
+
+    def __init__(self, source, f, acc):
+        self.source = source
+        self.f = f
+        self.acc = acc
+class IOMmap(IO):
+    __slots__ = ('handle', 'f')
+
+    def __init__(self, handle, f):
+        self.handle = handle
+        self.f = f
+class IOFlush(IO):
+    __slots__ = ('handle',)
+
     def __init__(self, handle):
         self.handle = handle
 
+class OutputBuffer:
+    '''
+    Coalesces consecutive writes to the same handle (~None~ is stdout) into one
+    write, made when ~size~ characters are pending, before a write to another
+    handle, or when ~flush~ is called. So the order of the output is the same as
+    writing each one immediately.
+    '''
+    __slots__ = ('size', 'handle', 'parts', 'pending')
+
+    def __init__(self, size):
+        self.size = size
+        self.handle = None
+        self.parts = []
+        self.pending = 0
+
+    def write(self, handle, x):
+        if handle is None:
+            x = str(x)
+        if self.parts and handle is not self.handle:
+            self.flush()
+        self.handle = handle
+        self.parts.append(x)
+        self.pending += len(x)
+        if self.pending >= self.size:
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        parts = self.parts
+        x = parts[0] if len(parts) == 1 else parts[0][:0].join(parts)
+        handle = self.handle
+        self.handle = None
+        self.parts = []
+        self.pending = 0
+        if handle is None:
+            print(x, end='')
+        else:
+            handle.write(x)
+
+def _run_pure(m, out):
+    return m.x
+
+def _run_input(m, out):
+    out.flush()
+    return input()
+
+def _run_output(m, out):
+    out.write(m.handle, m.x)
+    return Unit()
+
+def _run_flush(m, out):
+    out.flush()
+    if m.handle is None:
+        sys.stdout.flush()
+    else:
+        m.handle.flush()
+    return Unit()
+
+def _run_read_lines(m, out):
+    out.flush()
+    return LazyList(_chunks(m.handle.readline, m.handle))
+
+def _run_read_chunks(m, out):
+    out.flush()
+    return LazyList(_chunks(m.handle.read, m.handle, m.size))
+
+def _run_fold(m, out):
+    acc = m.acc
+    f = m.f
+    for x in _interpret(m.source, out):
+        acc = f(acc, x)
+    return acc
+
+def _run_mmap(m, out):
+    out.flush()
+    if not os.fstat(m.handle.fileno()).st_size:
+        return m.f(memoryview(b''))
+    with mmap.mmap(m.handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            return m.f(view)
+
+def _chunks(read, handle, *args):
+    while True:
+        if handle.closed:
+            raise ValueError('the file was closed before it was read: '
+                             'read it inside the IO program (see io_fold)')
+        chunk = read(*args)
+        if not chunk:
+            return
+        yield chunk
+
+def _run_file(m, out):
+    return open(m.file_path, m.io_mode)
+
+def _run_close(m, out):
+    out.flush()
+    m.handle.close()
+    return Unit()
+
+IO_PRIMITIVES = {
+    IO: _run_pure,
+    IOInput: _run_input,
+    IOOutput: _run_output,
+    IOFlush: _run_flush,
+    IOReadLines: _run_read_lines,
+    IOReadChunks: _run_read_chunks,
+    IOFold: _run_fold,
+    IOMmap: _run_mmap,
+    IOFile: _run_file,
+    IOClose: _run_close,
+}
+'''
+Maps each primitive IO action type to the function that performs it. Each
+function is given the action and the run's ~OutputBuffer~.
+'''
+
+def run_io(m, buffer_size=BUFFER_SIZE):
+    '''
+    run_io :: IO a -> a
+    Interprets an IO program. Binds are walked in a loop (so long programs
+    don't grow the Python stack) and each primitive is performed through
+    the ~IO_PRIMITIVES~ dispatch table.
+
+    Output is buffered (see ~OutputBuffer~): up to ~buffer_size~ characters
+    of consecutive writes are made as one write. The buffer is flushed by
+    ~io_flush~, before ~io_input~ and ~io_close~, and when the run ends.
+    Use a ~buffer_size~ of 0 to write each output immediately.
+
+    Only IO actions keep their order: output that Python code in a
+    continuation writes directly (like ~print~) isn't buffered, so it can
+    come before the buffered output of earlier actions (~io_flush~ first).
+    '''
+    out = OutputBuffer(buffer_size)
+    try:
+        a = _interpret(m, out)
+    except BaseException:
+        # Write what was buffered, but raise the program's error rather than
+        # one from the flush (e.g. if the program closed the handle itself)
+        try:
+            out.flush()
+        except Exception:
+            pass
+        raise
+    out.flush()
+    return a
+
+def _interpret(m, out):
+    '''
+    Runs the program m, writing its output to the ~OutputBuffer~ out
+    '''
+    primitives = IO_PRIMITIVES
+    konts = []
+    while True:
+        t = type(m)
+        if t is IOBind:
+            konts.append(m.f)
+            m = m.m
+            continue
+        a = primitives[t](m, out)
+        if not konts:
+            return a
+        m = konts.pop()(a)
+
 def io_print(x):
     '''
     io_print :: a -> IO ()
@@ -68,13 +290,20 @@ def io_println(x):
     io_println :: a -> IO ()
     '''
     return IOOutput(x + '\n', None)
-        
+
 def io_write(handle, x):
     '''
     io_write :: Handle -> a -> IO ()
     '''
     return IOOutput(x, handle)
 
+def io_flush(handle=None):
+    '''
+    io_flush :: Handle -> IO ()
+    Writes the buffered output, then flushes the handle (stdout by default)
+    '''
+    return IOFlush(handle)
+
 def io_close(handle):
     '''
     io_close :: Handle -> IO ()
@@ -87,6 +316,43 @@ def io_input():
     '''
     return IOInput()
 
+def io_read_lines(handle):
+    '''
+    io_read_lines :: Handle -> IO (LazyList String)
+    The lines of a file, read one at a time as the list is iterated (so the
+    list can only be iterated once). The reading happens outside of the IO
+    program, so the list must be used before the file is closed: to read the
+    file as a step of the program, use ~io_fold~.
+    '''
+    return IOReadLines(handle)
+
+def io_read_chunks(handle, size):
+    '''
+    io_read_chunks :: Handle -> Int -> IO (LazyList String)
+    The rest of a file in pieces of (at most) ~size~ characters (or bytes),
+    read one at a time as the list is iterated (see ~io_read_lines~).
+    '''
+    return IOReadChunks(handle, size)
+
+def io_fold(source, f, acc):
+    '''
+    io_fold :: IO (LazyList a) -> (b -> a -> b) -> b -> IO b
+    Runs ~source~ (like an ~io_read_lines~ or ~io_read_chunks~, or a program
+    that gives a LazyList or any other iterable) and reads the whole list as a
+    step of the program, combining each element into acc with ~f(acc, x)~.
+    Only one line or chunk is in memory at a time.
+    '''
+    return IOFold(source, f, acc)
+
+def io_mmap(handle, f):
+    '''
+    io_mmap :: Handle -> (memoryview -> a) -> IO a
+    Calls f with a read-only view of the whole file, mapped into memory (nothing
+    is copied: pages are read as they are used). The view and the mapping are
+    closed when f returns, so f must not keep the view (or slices of it).
+    '''
+    return IOMmap(handle, f)
+
 def io_open(file_path, io_mode='r'):
     '''
     type FilePath = String;
@@ -96,9 +362,10 @@ def io_open(file_path, io_mode='r'):
     return IOFile(file_path, io_mode)
 
 if __name__ == '__main__':
-    io_print('Enter some text: ') \
+    main = io_print('Enter some text: ') \
     .then(io_input()) \
         .bind(lambda text: io_open('test_file.txt', 'w') \
               .bind(lambda handle: io_write(handle, text + '!') \
                     .then(io_close(handle)) \
                     .then(io_print('Done'))))
+    main.run()
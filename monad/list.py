@@ -1,15 +1,28 @@
+import itertools
+import os
+
 from .monad import Monad
+from .maybe import Just, Nothing
+
+class List(Monad):
+    __slots__ = ('xs',)
 
-class List:
     def __init__(self, xs):
         self.xs = xs
-    
+
     @staticmethod
     def lift(x):
         return List([x])
 
-    def fmap(self, f):
-        return List(list(map(f, self.xs)))
+    def fmap(self, f, executor=None, chunksize=None):
+        '''
+        fmap :: List a -> (a -> b) -> List b
+        If an executor (e.g. a ~concurrent.futures.ProcessPoolExecutor~) is given,
+        f is applied in the executor, see ~parallel_map~.
+        '''
+        if executor is None:
+            return List(list(map(f, self.xs)))
+        return List(parallel_map(f, self.xs, executor, chunksize))
 
     def app(self, other):
         ys = []
@@ -18,17 +31,197 @@ class List:
                 ys.append(f(x))
         return List(ys)
 
-    def bind(self, f):
+    def bind(self, f, executor=None, chunksize=None):
+        '''
+        bind :: List a -> (a -> List b) -> List b
+        If an executor is given, each ~f(x)~ is expanded in the executor, see
+        ~parallel_map~ (the Lists f returns must be picklable too).
+        '''
         xs = []
-        for ys in self.fmap(f).xs:
-            xs += ys.xs
+        if executor is None:
+            for ys in self.fmap(f).xs:
+                xs += ys.xs
+        else:
+            for ys in parallel_map(_bind_step, self.xs, executor, chunksize, f):
+                xs += ys
         return List(xs)
 
     def filter(self, f):
-        return List(filter(f, self.xs))
+        return List(list(filter(f, self.xs)))
+
+    def lazy(self):
+        '''
+        Converts to a LazyList (over the same elements)
+        '''
+        return LazyList(self.xs)
+
+    def __iter__(self):
+        return iter(self.xs)
 
     def get(self):
         '''
         Extracts the value from the monad
         '''
         return self.xs
+
+PARALLEL_MIN_SIZE = 64
+'''
+Lists shorter than this are mapped serially even when an executor is given:
+the cost of sending them to the workers is more than the work.
+'''
+
+def parallel_map(f, xs, executor, chunksize=None, *args):
+    '''
+    parallel_map :: (a -> b) -> [a] -> Executor -> [b]
+    ~[f(x, *args) for x in xs]~, computed in the executor in chunks of ~chunksize~
+    elements (by default, about four chunks per CPU). The results are in the
+    order of xs. For a ~ProcessPoolExecutor~, f, xs and args must be picklable.
+    '''
+    if len(xs) < PARALLEL_MIN_SIZE:
+        return [f(x, *args) for x in xs]
+    if chunksize is None:
+        chunksize = -(-len(xs) // (4 * (os.cpu_count() or 1)))
+    return list(executor.map(f, xs, *map(itertools.repeat, args), chunksize=chunksize))
+
+def _bind_step(x, f):
+    return f(x).xs
+
+class LazyList(Monad):
+    '''
+    A List that is computed on demand.
+
+    ~fmap~, ~bind~, ~app~ and ~filter~ don't compute anything, elements are
+    only produced while the list is iterated. This means a search can stop
+    after the first few solutions (see ~take~ and ~first~) without
+    computing the rest.
+
+    The elements are recomputed each time the list is iterated. If ~xs~ is a
+    one-shot iterator (like a generator) the list can only be iterated once.
+
+    A chain of ~fmap~, ~bind~ and ~filter~ is kept as a list of steps that one
+    generator applies to each element (see ~Pipeline~), so a long chain
+    doesn't nest an iterator per step or grow the Python stack.
+    '''
+    __slots__ = ('xs',)
+
+    def __init__(self, xs):
+        self.xs = xs
+
+    @staticmethod
+    def lift(x):
+        return LazyList((x,))
+
+    def fmap(self, f):
+        return LazyList(Pipeline(self.xs, _MAP, f))
+
+    def app(self, other):
+        return LazyList(Rerun(_app, self, other))
+
+    def bind(self, f):
+        return LazyList(Pipeline(self.xs, _BIND, f))
+
+    def filter(self, f):
+        return LazyList(Pipeline(self.xs, _FILTER, f))
+
+    def take(self, n):
+        '''
+        take :: LazyList a -> Int -> LazyList a
+        The first (at most) n elements.
+        '''
+        return LazyList(Rerun(itertools.islice, self, n))
+
+    def first(self):
+        '''
+        first :: LazyList a -> Maybe a
+        Only computes as much of the list as needed to find the first element.
+        '''
+        for x in self:
+            return Just(x)
+        return Nothing()
+
+    def strict(self):
+        '''
+        Converts to a List (computes every element)
+        '''
+        return List(list(self))
+
+    def __iter__(self):
+        return iter(self.xs)
+
+    def get(self):
+        '''
+        Extracts the value from the monad (computes every element)
+        '''
+        return list(self)
+
+class Rerun:
+    '''
+    An iterable that calls ~f(*args)~ for a new iterator each time it is iterated.
+    '''
+    __slots__ = ('f', 'args')
+
+    def __init__(self, f, *args):
+        self.f = f
+        self.args = args
+
+    def __iter__(self):
+        return iter(self.f(*self.args))
+
+_MAP, _FILTER, _BIND = range(3)
+
+class Pipeline:
+    '''
+    An iterable of the elements of ~source~ with a step (an ~fmap~, ~filter~ or
+    ~bind~ of f) applied. When source is a Pipeline too, the steps are linked
+    and all of them are run by one generator (~_pipeline~), not nested.
+    '''
+    __slots__ = ('source', 'kind', 'f')
+
+    def __init__(self, source, kind, f):
+        self.source = source
+        self.kind = kind
+        self.f = f
+
+    def __iter__(self):
+        steps = []
+        p = self
+        while type(p) is Pipeline:
+            steps.append((p.kind, p.f))
+            p = p.source
+        steps.reverse()
+        return _pipeline(p, steps)
+
+def _pipeline(source, steps):
+    '''
+    Runs each element of source through the steps. The iterators of the lists
+    given by binds are kept on an explicit stack, each with the index of the
+    step its elements go to next.
+    '''
+    n = len(steps)
+    stack = [(iter(source), 0)]
+    while stack:
+        it, i = stack[-1]
+        x = next(it, _DONE)
+        if x is _DONE:
+            stack.pop()
+            continue
+        while i < n:
+            kind, f = steps[i]
+            i += 1
+            if kind == _MAP:
+                x = f(x)
+            elif kind == _FILTER:
+                if not f(x):
+                    break
+            else:
+                stack.append((iter(f(x)), i))
+                break
+        else:
+            yield x
+
+_DONE = object()
+
+def _app(fs, xs):
+    for f in fs:
+        for x in xs:
+            yield f(x)
@@ -4,6 +4,8 @@ class Maybe(Monad):
     '''
     Maybe a
     '''
+    __slots__ = ()
+
     @staticmethod
     def lift(x):
         '''
@@ -38,8 +40,19 @@ class Maybe(Monad):
         return self
 
 class Nothing(Maybe):
-    pass
+    '''
+    There is only one Nothing value, ~Nothing()~ always gives the same instance.
+    '''
+    __slots__ = ()
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
 
 class Just(Maybe):
+    __slots__ = ('x',)
+
     def __init__(self, x):
         self.x = x
@@ -0,0 +1,143 @@
+'''
+A column of Maybe values backed by NumPy (an optional dependency).
+'''
+import numpy as np
+
+from .monad import Monad
+from .maybe import Just, Nothing
+
+class MaybeArray(Monad):
+    '''
+    MaybeArray a
+    An array of Maybe a, stored as an array of values and a boolean mask that is
+    True where the value is a Just. The functions given to ~fmap~ and ~bind~ are
+    called once with an array of all of the Just values (so they should be
+    vectorized, like NumPy ufuncs), and behave like ~Maybe~'s element by element.
+
+    The values where the mask is False are undefined (zero-filled).
+    '''
+    __slots__ = ('values', 'mask')
+
+    def __init__(self, values, mask=None):
+        self.values = np.asarray(values)
+        self.mask = np.ones(self.values.shape[:1] if self.values.ndim else (), dtype=bool) \
+            if mask is None else np.asarray(mask, dtype=bool)
+
+    @staticmethod
+    def lift(x):
+        '''
+        lift :: a -> MaybeArray a
+        A single Just (a 0-d MaybeArray) that broadcasts against any other MaybeArray,
+        e.g. ~MaybeArray.lift(f).app(xs)~.
+        '''
+        if np.isscalar(x):
+            return MaybeArray(np.asarray(x), True)
+        values = np.empty((), dtype=object)
+        values[()] = x
+        return MaybeArray(values, True)
+
+    @staticmethod
+    def from_list(ms):
+        '''
+        from_list :: [Maybe a] -> MaybeArray a
+        '''
+        mask = np.fromiter((isinstance(m, Just) for m in ms), dtype=bool, count=len(ms))
+        valid = [m.x for m in ms if isinstance(m, Just)]
+        return MaybeArray(_scatter(mask, np.asarray(valid)), mask)
+
+    def to_list(self):
+        '''
+        to_list :: MaybeArray a -> [Maybe a]
+        '''
+        return [Just(x) if m else Nothing() for x, m in zip(self.values.tolist(), self.mask.tolist())]
+
+    def fmap(self, f):
+        '''
+        fmap :: MaybeArray a -> (Array a -> Array b) -> MaybeArray b
+        '''
+        if self.mask.all():
+            return MaybeArray(f(self.values), self.mask)
+        return MaybeArray(_scatter(self.mask, f(self.values[self.mask])), self.mask)
+
+    def bind(self, f):
+        '''
+        bind :: MaybeArray a -> (Array a -> MaybeArray b) -> MaybeArray b
+        f is given the Just values, and must give a MaybeArray of the same length
+        (or a single one, from ~lift~, that is repeated).
+        '''
+        if self.mask.ndim == 0:
+            return f(self.values) if self.mask else self
+        every = self.mask.all()
+        valid = self.values if every else self.values[self.mask]
+        m = f(valid)
+        values, just = _fit(m.values, len(valid)), _fit(m.mask, len(valid))
+        if every:
+            return MaybeArray(values, just)
+        mask = self.mask.copy()
+        mask[self.mask] = just
+        return MaybeArray(_scatter(self.mask, values), mask)
+
+    def app(self, other):
+        '''
+        <*> :: MaybeArray (a -> b) -> MaybeArray a -> MaybeArray b
+        If self is a single function (from ~lift~) it is called once with the array of
+        Just values in other. Otherwise each function is applied to its element.
+        '''
+        if self.values.ndim == 0:
+            f = self.values[()]
+            return other.fmap(f) if self.mask else MaybeArray(other.values, np.zeros_like(other.mask))
+        mask = self.mask & other.mask
+        valid = np.nonzero(mask)[0]
+        fs = self.values[valid]
+        xs = other.values[valid] if other.values.ndim else [other.values[()]] * len(valid)
+        ys = np.empty(len(valid), dtype=object)
+        ys[:] = [f(x) for f, x in zip(fs, xs)]
+        return MaybeArray(_scatter(mask, ys), mask)
+
+    @staticmethod
+    def lift_a2(f, a, b):
+        '''
+        lift_a2 :: (Array a -> Array b -> Array c) -> MaybeArray a -> MaybeArray b -> MaybeArray c
+        Same as ~lift(curry(f)).app(a).app(b)~, but f is called once with the arrays of
+        values where both a and b are Just.
+        '''
+        mask = a.mask & b.mask
+        if mask.all():
+            return MaybeArray(f(a.values, b.values), mask)
+        return MaybeArray(_scatter(mask, f(_valid(a, mask), _valid(b, mask))), mask)
+
+    def from_maybe(self, default):
+        '''
+        from_maybe :: MaybeArray a -> a -> Array a
+        The values, with default where there is a Nothing.
+        '''
+        return np.where(self.mask, self.values, default)
+
+    def __len__(self):
+        return len(self.mask)
+
+def _scatter(mask, valid):
+    '''
+    An array shaped like mask with the valid values where the mask is True (zero elsewhere)
+    '''
+    valid = np.asarray(valid)
+    out = np.zeros(mask.shape + valid.shape[1:], dtype=valid.dtype)
+    out[mask] = valid
+    return out
+
+def _fit(x, n):
+    '''
+    x as an array of n rows: a 0-d x (from ~lift~) is repeated, any other x
+    must have n rows
+    '''
+    if x.ndim == 0:
+        return np.broadcast_to(x, (n,)).copy()
+    if len(x) != n:
+        raise ValueError('bind: f gave %d rows for %d values' % (len(x), n))
+    return x
+
+def _valid(m, mask):
+    '''
+    The values of m (broadcast to the shape of mask) where mask is True
+    '''
+    return np.broadcast_to(m.values, mask.shape)[mask]
@@ -0,0 +1,125 @@
+'''
+Numeric outputs for a StreamWriter, accumulated in place in NumPy arrays (an
+optional dependency).
+
+    requests = StreamWriter.tell([12.5]).then(StreamWriter.tell([3.0]))
+    requests.collect(Metrics(count=Count(), total=Sum(), latency=Histogram(0, 100, 10)))
+    # (Unit, {'count': 2, 'total': 15.5, 'latency': array([1, 1, 0, ...])})
+
+Each metric is given the told numbers a batch at a time, and updates its
+preallocated accumulator with one vectorized operation per batch instead of
+one boxed addition per number. A metric is for one run: ~result~ freezes it.
+'''
+import numpy as np
+
+class Metric:
+    '''
+    An accumulator for the numbers told in a StreamWriter (see ~StreamWriter.collect~).
+    Each metric's ~add(batch)~ adds a batch of numbers (a list) to ~acc~ in place.
+    '''
+    __slots__ = ('acc',)
+
+    def __init__(self, acc):
+        self.acc = acc
+
+    def result(self):
+        '''
+        The value of the metric. The accumulator is frozen (read-only) from then on.
+        '''
+        self.acc.setflags(write=False)
+        return self.acc[0].item()
+
+class Sum(Metric):
+    __slots__ = ()
+
+    def __init__(self, dtype=float):
+        Metric.__init__(self, np.zeros(1, dtype=dtype))
+
+    def add(self, batch):
+        self.acc += np.sum(batch, dtype=self.acc.dtype)
+
+class Count(Metric):
+    __slots__ = ()
+
+    def __init__(self):
+        Metric.__init__(self, np.zeros(1, dtype=np.int64))
+
+    def add(self, batch):
+        self.acc += len(batch)
+
+class Min(Metric):
+    '''
+    The smallest number (~inf~ if there were none)
+    '''
+    __slots__ = ()
+
+    def __init__(self):
+        Metric.__init__(self, np.full(1, np.inf))
+
+    def add(self, batch):
+        np.minimum(self.acc, np.min(batch), out=self.acc)
+
+class Max(Metric):
+    '''
+    The largest number (~-inf~ if there were none)
+    '''
+    __slots__ = ()
+
+    def __init__(self):
+        Metric.__init__(self, np.full(1, -np.inf))
+
+    def add(self, batch):
+        np.maximum(self.acc, np.max(batch), out=self.acc)
+
+class Histogram(Metric):
+    '''
+    The count of numbers in each of ~bins~ equal width bins from ~lo~ to ~hi~.
+    Numbers below ~lo~ or from ~hi~ up aren't in any bin, they are counted in
+    ~underflow~ and ~overflow~. NaN can't be counted: ~add~ raises a ValueError.
+    '''
+    __slots__ = ('lo', 'width')
+
+    def __init__(self, lo, hi, bins):
+        # acc[0] is the underflow, acc[-1] the overflow, and the bins are in between
+        Metric.__init__(self, np.zeros(bins + 2, dtype=np.int64))
+        self.lo = lo
+        self.width = (hi - lo) / bins
+
+    def add(self, batch):
+        xs = np.asarray(batch, dtype=float)
+        if np.isnan(xs).any():
+            raise ValueError('a Histogram can\'t count NaN')
+        n = len(self.acc)
+        i = np.clip(np.floor((xs - self.lo) / self.width), -1, n - 2).astype(np.intp) + 1
+        self.acc += np.bincount(i, minlength=n)
+
+    @property
+    def underflow(self):
+        return self.acc[0].item()
+
+    @property
+    def overflow(self):
+        return self.acc[-1].item()
+
+    def result(self):
+        '''
+        The count in each bin (see ~underflow~ and ~overflow~ for the rest)
+        '''
+        self.acc.setflags(write=False)
+        return self.acc[1:-1]
+
+class Metrics:
+    '''
+    Several metrics of the same numbers, by name
+    '''
+    __slots__ = ('metrics',)
+
+    def __init__(self, **metrics):
+        self.metrics = metrics
+
+    def add(self, batch):
+        for m in self.metrics.values():
+            m.add(batch)
+
+    def result(self):
+        return {name: m.result() for name, m in self.metrics.items()}
@@ -1,6 +1,20 @@
 class Monad:
+    __slots__ = ()
+
     def then(self, other):
         '''
         then :: m a -> m b -> m b
         '''
-        return self.bind(lambda _: other)
+        return self.bind(Const(other))
+
+class Const:
+    '''
+    A function that ignores its argument and gives ~x~ (a picklable ~lambda _: x~)
+    '''
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+
+    def __call__(self, _):
+        return self.x
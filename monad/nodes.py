@@ -0,0 +1,63 @@
+'''
+The pieces shared by the monads whose programs are trees of nodes, run by a
+loop over an explicit stack of continuations (State, Reader, RWS and
+StreamWriter).
+'''
+from .writer import run_log
+
+class Apply:
+    '''
+    Marks where ~run~ applies the function from the left side of an ~app~.
+    '''
+    __slots__ = ('f',)
+
+    def __init__(self, f):
+        self.f = f
+
+class Restore:
+    '''
+    Marks where ~run~ leaves the scope of a ~local~, with the environment to
+    restore.
+    '''
+    __slots__ = ('e',)
+
+    def __init__(self, e):
+        self.e = e
+
+class Scope:
+    '''
+    Marks where ~run~ leaves the scope of a ~listen~ (~f~ is None) or a
+    ~censor(f)~, with the log from before the scope.
+    '''
+    __slots__ = ('f', 'w')
+
+    def __init__(self, f, w):
+        self.f = f
+        self.w = w
+
+    def leave(self, a, w):
+        '''
+        The value and the output (~[]~ if there is none) of the scope, given
+        its value a and its log w
+        '''
+        inner = run_log(w)
+        if self.f is None:
+            return ((a, inner), inner)
+        return (a, self.f(inner))
+
+def reduce_spine(m, spine_fields):
+    '''
+    Pickles a chain of nodes as a flat list, so a long chain doesn't exceed
+    pickle's recursion limit. ~spine_fields~ maps the types of the nodes whose
+    ~m~ runs first to the name of their other field.
+    '''
+    spine = []
+    while type(m) in spine_fields:
+        spine.append((type(m), getattr(m, spine_fields[type(m)])))
+        m = m.m
+    return (rebuild_spine, (m, spine))
+
+def rebuild_spine(m, spine):
+    for cls, x in reversed(spine):
+        m = cls(m, x)
+    return m
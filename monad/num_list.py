@@ -0,0 +1,120 @@
+'''
+A List of numbers backed by NumPy (an optional dependency).
+'''
+import numpy as np
+
+from .monad import Monad
+from .list import List
+
+class NumList(Monad):
+    '''
+    NumList a
+    Same as ~List~ (including the order of the results), but the elements are
+    kept in a NumPy array and the functions given to ~fmap~ are called once with
+    the whole array (so they should be elementwise, like NumPy ufuncs).
+
+    Mapping a curried function, e.g. ~xs.fmap(lambda x: lambda y: x + y).app(ys)~,
+    computes the outer product by broadcasting instead of a nested loop.
+    '''
+    __slots__ = ('xs', 'fn', 'shape')
+
+    def __init__(self, xs, fn=None, shape=None):
+        self.xs = None if xs is None else np.asarray(xs)
+        self.fn = fn
+        '''
+        Set instead of ~xs~ when the elements are (curried) functions: ~fn~ is the
+        curried function applied to a grid of the arguments so far, whose shape is
+        ~shape~. The grid's axes are in reverse (the first argument is the last
+        axis), so the next argument broadcasts as a new leading axis.
+        '''
+        self.shape = shape
+
+    @staticmethod
+    def lift(x):
+        return NumList([x])
+
+    def fmap(self, f):
+        '''
+        fmap :: NumList a -> (a -> b) -> NumList b
+        '''
+        xs = self.get()
+        ys = f(xs)
+        if callable(ys):
+            return NumList(None, ys, xs.shape)
+        return NumList(ys)
+
+    def app(self, other):
+        '''
+        <*> :: NumList (a -> b) -> NumList a -> NumList b
+        '''
+        xs = other.get()
+        if self.fn is not None:
+            shape = self.shape + xs.shape
+            ys = self.fn(xs.reshape(xs.shape + (1,) * len(self.shape)))
+            if callable(ys):
+                return NumList(None, ys, shape)
+            return NumList(np.broadcast_to(ys, shape[::-1]).transpose().reshape(-1))
+        return NumList(np.concatenate([np.broadcast_to(f(xs), xs.shape) for f in self.xs])
+                       if len(self.xs) else xs[:0])
+
+    def bind(self, f):
+        '''
+        bind :: NumList a -> (a -> NumList b) -> NumList b
+        '''
+        xs = self.get()
+        if not len(xs):
+            return NumList(xs)
+        return NumList(np.concatenate([f(x).get() for x in xs]))
+
+    def filter(self, f):
+        '''
+        Keeps the elements where the (vectorized) predicate is true
+        '''
+        xs = self.get()
+        return NumList(xs[np.asarray(f(xs), dtype=bool)])
+
+    def strict(self):
+        '''
+        Converts to a List
+        '''
+        return List(self.get().tolist())
+
+    def __iter__(self):
+        return iter(self.get())
+
+    def __len__(self):
+        return len(self.get())
+
+    def get(self):
+        '''
+        Extracts the array from the monad
+        '''
+        if self.xs is None:
+            return _functions(self.fn, self.shape)
+        return self.xs
+
+def _functions(fn, shape):
+    '''
+    The curried functions of a grid, as a flat object array in List's order
+    '''
+    n = int(np.prod(shape))
+    fs = np.empty(n, dtype=object)
+    for i, index in enumerate(np.ndindex(*shape)):
+        fs[i] = _Pick(fn, index, shape)
+    return fs
+
+class _Pick:
+    '''
+    One of the functions in a grid: calls ~fn~ and picks out the result at ~index~
+    '''
+    __slots__ = ('fn', 'index', 'shape')
+
+    def __init__(self, fn, index, shape):
+        self.fn = fn
+        self.index = index
+        self.shape = shape
+
+    def __call__(self, y):
+        y = np.asarray(y)
+        r = self.fn(y.reshape(y.shape + (1,) * len(self.shape)))
+        return np.broadcast_to(r, y.shape + self.shape[::-1])[(Ellipsis,) + self.index[::-1]]
@@ -0,0 +1,283 @@
+'''
+Opt-in profiling of monadic code.
+
+    with profiling() as p:
+        main.run(4)
+    p.print_report()
+    p.dump_stats('main.prof') # load with pstats.Stats('main.prof')
+
+While a profile is enabled, the ~bind~/~fmap~/~app~/~then~/~run~ methods
+of every monad are replaced by wrappers that count and time them, and the
+functions given to ~bind~ and ~fmap~ (the user's continuations) are timed
+as well. The original methods are put back when the profile is disabled,
+so profiling costs nothing while it is off.
+
+Continuations are wrapped when ~bind~/~fmap~ is called, so for the monads
+that build a program before running it (Reader, State, IO, AsyncIO, Cont, Free) build the
+program inside the profile to see the time spent in its continuations.
+'''
+import marshal
+import time
+
+from .monad import Monad
+from .identity import Identity
+from .maybe import Maybe
+from .either import Either
+from .list import List, LazyList
+from .reader import Reader
+from .state import State
+from .rws import RWS
+from .writer import Writer
+from .io import IO
+from .aio import AsyncIO
+from .cont import Cont
+from .free import Free
+
+MONADS = (Identity, Maybe, Either, List, LazyList, Reader, State, RWS, Writer, IO, AsyncIO, Cont, Free)
+'''
+The monads that are profiled (subclasses are counted as their monad, e.g. Just as Maybe)
+'''
+
+METHODS = ('bind', 'fmap', 'app', 'then', 'run')
+
+CONTINUATIONS = ('bind', 'fmap')
+'''
+Methods whose function argument is timed as user code
+'''
+
+class Stat:
+    '''
+    Counts and times for one function (a library method or a user continuation).
+    ~self_time~ excludes time spent in the functions it called, ~total_time~ doesn't.
+    '''
+    __slots__ = ('monad', 'op', 'user', 'code', 'calls', 'self_time', 'total_time', 'max_depth', 'callers')
+
+    def __init__(self, monad, op, user, code):
+        self.monad = monad
+        self.op = op
+        self.user = user
+        self.code = code
+        self.calls = 0
+        self.self_time = 0.0
+        self.total_time = 0.0
+        self.max_depth = 0
+        self.callers = {}
+
+    def label(self):
+        '''
+        (file name, line number, function name) -- the key pstats uses
+        '''
+        filename, lineno, name = self.code
+        if self.user:
+            return (filename, lineno, '%s (%s.%s)' % (name, self.monad, self.op))
+        return (filename, lineno, '%s.%s' % (self.monad, self.op))
+
+class Profile:
+    _active = None
+
+    def __init__(self):
+        self.stats = {}
+        self.stack = []
+        self.max_depth = 0
+        self.wall_time = 0.0
+        self._saved = []
+        self._start = None
+
+    def enable(self):
+        if Profile._active is not None:
+            raise RuntimeError('A monad profile is already enabled')
+        Profile._active = self
+        for cls in _classes():
+            for name in METHODS:
+                method = cls.__dict__.get(name)
+                if method is None or isinstance(method, staticmethod):
+                    continue
+                self._saved.append((cls, name, method))
+                setattr(cls, name, self._wrap_method(name, method))
+        self._start = time.perf_counter()
+
+    def disable(self):
+        if Profile._active is not self:
+            return
+        self.wall_time += time.perf_counter() - self._start
+        for cls, name, method in reversed(self._saved):
+            setattr(cls, name, method)
+        self._saved = []
+        Profile._active = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def _wrap_method(self, op, method):
+        code = _code(method)
+        call = self._call
+        wrap_user = self._wrap_user
+        if op in CONTINUATIONS:
+            def wrapped(m, f, *args, **kwargs):
+                monad = _monad(type(m))
+                return call((monad, op, False, code), method, m, wrap_user(monad, op, f), *args, **kwargs)
+        else:
+            def wrapped(m, *args, **kwargs):
+                return call((_monad(type(m)), op, False, code), method, m, *args, **kwargs)
+        wrapped.__wrapped__ = method
+        return wrapped
+
+    def _wrap_user(self, monad, op, f):
+        if type(f) is _Timed:
+            return f
+        return _Timed(self, (monad, op, True, _code(f)), f)
+
+    def _call(self, key, f, *args, **kwargs):
+        stat = self.stats.get(key)
+        if stat is None:
+            stat = self.stats[key] = Stat(*key)
+        stack = self.stack
+        caller = stack[-1][0] if stack else None
+        frame = [key, 0.0]
+        stack.append(frame)
+        depth = len(stack)
+        if depth > stat.max_depth:
+            stat.max_depth = depth
+            if depth > self.max_depth:
+                self.max_depth = depth
+        start = time.perf_counter()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            stat.calls += 1
+            stat.total_time += elapsed
+            stat.self_time += elapsed - frame[1]
+            if stack:
+                stack[-1][1] += elapsed
+            if caller is not None:
+                c = stat.callers.get(caller)
+                stat.callers[caller] = (c[0] + 1, c[1] + 1, c[2] + elapsed - frame[1], c[3] + elapsed) \
+                    if c else (1, 1, elapsed - frame[1], elapsed)
+
+    def counts(self):
+        '''
+        {(monad, op): calls} for the library methods
+        '''
+        counts = {}
+        for stat in self.stats.values():
+            if not stat.user:
+                counts[(stat.monad, stat.op)] = counts.get((stat.monad, stat.op), 0) + stat.calls
+        return counts
+
+    def user_time(self):
+        '''
+        Seconds spent inside user continuations (excluding library calls made from them)
+        '''
+        return sum(s.self_time for s in self.stats.values() if s.user)
+
+    def library_time(self):
+        '''
+        Seconds spent inside library methods (excluding user continuations they called)
+        '''
+        return sum(s.self_time for s in self.stats.values() if not s.user)
+
+    def report(self):
+        '''
+        A flat text report: one line per library method and per user continuation,
+        sorted by self time.
+        '''
+        lines = ['%-8s %-8s %10s %10s %10s %6s  %s' % ('monad', 'op', 'calls', 'self(s)', 'total(s)', 'depth', 'function')]
+        for stat in sorted(self.stats.values(), key=lambda s: s.self_time, reverse=True):
+            filename, lineno, name = stat.code
+            lines.append('%-8s %-8s %10d %10.6f %10.6f %6d  %s' % (
+                stat.monad, stat.op + (' fn' if stat.user else ''), stat.calls,
+                stat.self_time, stat.total_time, stat.max_depth,
+                '%s:%d(%s)' % (filename, lineno, name)))
+        lines.append('')
+        lines.append('wall time %.6fs, library %.6fs, user continuations %.6fs, peak depth %d' % (
+            self.wall_time, self.library_time(), self.user_time(), self.max_depth))
+        return '\n'.join(lines)
+
+    def print_report(self):
+        print(self.report())
+
+    def dump_stats(self, path):
+        '''
+        Writes the stats in the format of ~cProfile.Profile.dump_stats~, so they can be
+        loaded with ~pstats.Stats(path)~ (or tools that read pstats files).
+        '''
+        stats = {}
+        for stat in self.stats.values():
+            callers = {self.stats[k].label(): v for k, v in stat.callers.items()}
+            stats[stat.label()] = (stat.calls, stat.calls, stat.self_time, stat.total_time, callers)
+        with open(path, 'wb') as f:
+            marshal.dump(stats, f)
+
+class _Timed:
+    '''
+    A user continuation, timed by the profile while it is enabled. A program
+    built while profiling may be run after ~disable()~ (then ~f~ is called
+    directly) or pickled (then only ~f~ is pickled, see ~State.run_many~ and
+    ~List.fmap~ with a ~ProcessPoolExecutor~).
+    '''
+    __slots__ = ('profile', 'key', 'f')
+
+    def __init__(self, profile, key, f):
+        self.profile = profile
+        self.key = key
+        self.f = f
+
+    def __call__(self, *args):
+        if Profile._active is not self.profile:
+            return self.f(*args)
+        return self.profile._call(self.key, self.f, *args)
+
+    def __reduce__(self):
+        return (_untimed, (self.f,))
+
+def _untimed(f):
+    return f
+
+def profiling():
+    '''
+    A context manager that profiles the monads used inside of it.
+    '''
+    return Profile()
+
+_monads = {}
+
+def _monad(cls):
+    '''
+    The name of the monad that ~cls~ belongs to
+    '''
+    name = _monads.get(cls)
+    if name is None:
+        name = next((c.__name__ for c in cls.__mro__ if c in MONADS), cls.__name__)
+        _monads[cls] = name
+    return name
+
+def _classes():
+    '''
+    Every class that defines a method of a profiled monad
+    '''
+    seen = [Monad]
+    todo = list(MONADS)
+    while todo:
+        cls = todo.pop()
+        if cls not in seen:
+            seen.append(cls)
+            todo.extend(cls.__subclasses__())
+    return seen
+
+def _code(f):
+    '''
+    Where f is defined. For a callable object (like a ~Const~), this is its
+    class's ~__call__~, so every instance has the same key.
+    '''
+    code = getattr(f, '__code__', None)
+    if code is None:
+        code = getattr(getattr(type(f), '__call__', None), '__code__', None)
+    if code is None:
+        return ('~', 0, getattr(f, '__qualname__', type(f).__qualname__))
+    return (code.co_filename, code.co_firstlineno, code.co_name)
@@ -1,19 +1,33 @@
+import itertools
+
 from .monad import Monad
+from .nodes import Apply, Restore, reduce_spine
 
 class Reader(Monad):
     '''
     Reader e a
+
+    A Reader is a tree of nodes: either a primitive step (a function
+    e -> a), ~ReaderPure~, ~ReaderAsk~, or a ~ReaderBind~/~ReaderMap~/
+    ~ReaderApp~/~ReaderLocal~ node. ~run~ walks the tree in a loop, so long
+    chains of binds don't grow the Python stack.
+
+    Apart from ~Reader(f)~ itself, the nodes hold no lambdas: a program built
+    from lift/ask and module-level functions can be pickled (e.g. sent to a
+    ~ProcessPoolExecutor~) and run the same way on the other side.
     '''
+    __slots__ = ('step',)
+
     def __init__(self, run):
-        self.run = run
-        
+        self.step = run
+
     @staticmethod
     def lift(x):
         '''
         lift :: a -> Reader e a
         Makes a reader that ignore environment and return x
         '''
-        return Reader(lambda e: x)
+        return ReaderPure(x)
 
     @staticmethod
     def ask():
@@ -21,28 +35,177 @@ class Reader(Monad):
         ask :: Reader e a -> Reader e e
         Makes a reader that gives the environment
         '''
-        return Reader(lambda e: e)
+        return ReaderAsk()
 
     def local(self, f):
         '''
         local :: Reader e a -> (e -> e) -> Reader e a
         '''
-        return Reader(lambda e: self.run(f(e)))
+        return ReaderLocal(self, f)
 
     def bind(self, f):
         '''
         bind :: (Reader e a) -> (a -> Reader e b) -> (Reader e b)
         '''
-        return Reader(lambda e: f(self.run(e)).run(e))
+        return ReaderBind(self, f)
 
     def fmap(self, f):
         '''
         fmap :: Reader e a -> Reader e b
         '''
-        return Reader(lambda e: f(self.run(e)))
+        return ReaderMap(self, f)
 
-    def app(self, other):
+    def app(self, other, executor=None):
         '''
         <*> :: Reader e (a -> b) -> Reader e a -> Reader e b
+        If an executor (e.g. a ~concurrent.futures.ThreadPoolExecutor~) is given,
+        ~self~ runs in the executor while ~other~ runs in the calling thread.
+        '''
+        if executor is None:
+            return ReaderApp(self, other)
+        def run(e):
+            f = executor.submit(_run, self, e)
+            a = other.run(e)
+            return f.result()(a)
+        return Reader(run)
+
+    @staticmethod
+    def traverse(f, xs, executor=None, chunksize=1):
+        '''
+        traverse :: (a -> Reader e b) -> [a] -> Reader e [b]
+        Runs ~f(x)~ for each x against the same environment. If an executor is
+        given, each ~f(x).run(e)~ is done in the executor (for a
+        ~ProcessPoolExecutor~, f, xs and the environment must be picklable, but the
+        readers f returns don't need to be). ~chunksize~ is passed to
+        ~executor.map~.
+        '''
+        def run(e):
+            if executor is None:
+                return [f(x).run(e) for x in xs]
+            return list(executor.map(_traverse_step, itertools.repeat(f), xs,
+                                     itertools.repeat(e), chunksize=chunksize))
+        return Reader(run)
+
+    @staticmethod
+    def sequence(ms, executor=None, chunksize=1):
+        '''
+        sequence :: [Reader e a] -> Reader e [a]
+        See ~traverse~ (here the readers themselves must be picklable to use a
+        ~ProcessPoolExecutor~).
+        '''
+        return Reader.traverse(_identity, ms, executor, chunksize)
+
+    def run(self, e):
         '''
-        return Reader(lambda e: self.run(e)(other.run(e)))
+        run :: Reader e a -> e -> a
+        Trampolined: runs in constant Python stack space for any chain of binds.
+        '''
+        m = self
+        konts = []
+        while True:
+            t = type(m)
+            if t is ReaderLocal:
+                konts.append(Restore(e))
+                e = m.f(e)
+                m = m.m
+                continue
+            if t in _SPINE:
+                konts.append(m)
+                m = m.m
+                continue
+            if t is ReaderPure:
+                a = m.x
+            elif t is ReaderAsk:
+                a = e
+            else:
+                a = m.step(e)
+            while konts:
+                k = konts.pop()
+                t = type(k)
+                if t is ReaderMap or t is Apply:
+                    a = k.f(a)
+                elif t is Restore:
+                    e = k.e
+                elif t is ReaderBind:
+                    m = k.f(a)
+                    break
+                else:
+                    konts.append(Apply(a))
+                    m = k.other
+                    break
+            else:
+                return a
+
+class ReaderPure(Reader):
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+class ReaderAsk(Reader):
+    __slots__ = ()
+
+    def __init__(self):
+        pass
+
+class ReaderBind(Reader):
+    '''
+    A suspended ~m.bind(f)~ -- interpreted by ~Reader.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+class ReaderMap(Reader):
+    '''
+    A suspended ~m.fmap(f)~ -- interpreted by ~Reader.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+class ReaderApp(Reader):
+    '''
+    A suspended ~m.app(other)~ -- interpreted by ~Reader.run~.
+    '''
+    __slots__ = ('m', 'other')
+
+    def __init__(self, m, other):
+        self.m = m
+        self.other = other
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+class ReaderLocal(Reader):
+    '''
+    A suspended ~m.local(f)~ -- interpreted by ~Reader.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+
+_SPINE = {ReaderBind: 'f', ReaderMap: 'f', ReaderApp: 'other', ReaderLocal: 'f'}
+'''
+The nodes whose ~m~ runs first, and the name of their other field
+'''
+
+def _run(m, e):
+    return m.run(e)
+
+def _traverse_step(f, x, e):
+    return f(x).run(e)
+
+def _identity(x):
+    return x
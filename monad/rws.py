@@ -0,0 +1,329 @@
+from .monad import Monad
+from .unit import Unit
+from .writer import log_append, mconcat, run_log
+from .nodes import Apply, Restore, Scope, reduce_spine
+
+class RWS(Monad):
+    '''
+    RWS e w s a
+    Reader, Writer and State in one monad: the computation can read an
+    environment e (like ~Reader~), produce output w (like ~Writer~) and keep
+    a state s (like ~State~). The value is a.
+
+    The environment and initial state are given when ~rws.run~ is called.
+
+    Unlike nesting the three monads, a bind here is one step: ~run~ walks the
+    tree of nodes in a loop (like ~State.run~), threading the environment,
+    the log and the state as plain variables. The output is appended to a log
+    in O(1) and combined once (see ~monad.writer.mconcat~), so any monoid
+    (like ~str~) can be told.
+    '''
+    __slots__ = ('step',)
+
+    def __init__(self, run):
+        self.step = run
+        '''
+        A primitive step: a function (e, s) -> (a, w, s)
+        '''
+
+    @staticmethod
+    def lift(x):
+        '''
+        lift :: a -> RWS e w s a
+        '''
+        return RWSPure(x)
+
+    def fmap(self, f):
+        return RWSMap(self, f)
+
+    def app(self, other):
+        return RWSApp(self, other)
+
+    def bind(self, f):
+        return RWSBind(self, f)
+
+    @staticmethod
+    def ask():
+        '''
+        ask :: RWS e w s e
+        Gives the environment
+        '''
+        return RWSAsk()
+
+    def local(self, f):
+        '''
+        local :: RWS e w s a -> (e -> e) -> RWS e w s a
+        Runs self with the environment mapped by f
+        '''
+        return RWSLocal(self, f)
+
+    @staticmethod
+    def tell(w):
+        '''
+        tell :: w -> RWS e w s ()
+        '''
+        return RWSTell(w)
+
+    def listen(self):
+        '''
+        listen :: RWS e w s a -> RWS e w s (a, w)
+        Gives the value and the output of self (the output is still produced).
+        '''
+        return RWSListen(self)
+
+    def listens(self, f):
+        '''
+        listens :: RWS e w s a -> (w -> b) -> RWS e w s (a, b)
+        '''
+        return self.listen().fmap(lambda t: (t[0], f(t[1])))
+
+    def censor(self, f):
+        '''
+        censor :: RWS e w s a -> (w -> w) -> RWS e w s a
+        Runs self and maps f over its output.
+        '''
+        return RWSCensor(self, f)
+
+    @staticmethod
+    def get():
+        '''
+        get :: RWS e w s s
+        Access the state value
+        '''
+        return RWSGet()
+
+    @staticmethod
+    def put(x):
+        '''
+        put :: s -> RWS e w s ()
+        Set the state value
+        '''
+        return RWSPut(x)
+
+    @staticmethod
+    def modify(f):
+        '''
+        modify :: (s -> s) -> RWS e w s ()
+        Maps f over the state value
+        '''
+        return RWSModify(f)
+
+    @staticmethod
+    def reader(m):
+        '''
+        reader :: Reader e a -> RWS e w s a
+        '''
+        return RWS(lambda e, s: (m.run(e), None, s))
+
+    @staticmethod
+    def writer(m):
+        '''
+        writer :: Writer w a -> RWS e w s a
+        '''
+        x, w = m.t
+        w = mconcat(w)
+        return RWS(lambda e, s: (x, w, s))
+
+    @staticmethod
+    def state(m):
+        '''
+        state :: State s a -> RWS e w s a
+        '''
+        def step(e, s):
+            a, s = m.run(s)
+            return (a, None, s)
+        return RWS(step)
+
+    def run(self, e, s, sink=None, batch_size=1024):
+        '''
+        run :: RWS e w s a -> e -> s -> (a, s, w)
+        Trampolined: runs in constant Python stack space for any chain of binds.
+
+        If a ~sink~ (a function of a list) is given, the output must be lists,
+        and instead of being kept until the end it is given to the sink in
+        batches of ~batch_size~ entries as the program runs (the output is then
+        ~[]~). The output inside a ~listen~ or ~censor~ is kept until the end of
+        its scope. See ~monad.stream_writer~.
+        '''
+        m = self
+        w = None
+        buf = []
+        depth = 0
+        konts = []
+        while True:
+            t = type(m)
+            if t in _SPINE:
+                konts.append(m)
+                m = m.m
+                continue
+            if t is RWSLocal:
+                konts.append(Restore(e))
+                e = m.f(e)
+                m = m.m
+                continue
+            if t is RWSListen or t is RWSCensor:
+                konts.append(Scope(m.f if t is RWSCensor else None, w))
+                w = None
+                depth += 1
+                m = m.m
+                continue
+            if t is RWSPure:
+                a = m.x
+            elif t is RWSAsk:
+                a = e
+            elif t is RWSGet:
+                a = s
+            elif t is RWSPut:
+                a = Unit()
+                s = m.x
+            elif t is RWSModify:
+                a = Unit()
+                s = m.f(s)
+            else:
+                if t is RWSTell:
+                    a = Unit()
+                    w2 = m.w
+                else:
+                    a, w2, s = m.step(e, s)
+                if sink is None or depth:
+                    w = log_append(w, w2)
+                elif w2:
+                    buf.extend(w2)
+                    if len(buf) >= batch_size:
+                        _flush(sink, buf, batch_size)
+            while konts:
+                k = konts.pop()
+                t = type(k)
+                if t is RWSMap or t is Apply:
+                    a = k.f(a)
+                elif t is Restore:
+                    e = k.e
+                elif t is Scope:
+                    a, inner = k.leave(a, w)
+                    w = k.w
+                    depth -= 1
+                    if sink is None or depth:
+                        w = log_append(w, inner)
+                    elif inner:
+                        buf.extend(inner)
+                        if len(buf) >= batch_size:
+                            _flush(sink, buf, batch_size)
+                elif t is RWSBind:
+                    m = k.f(a)
+                    break
+                else:
+                    konts.append(Apply(a))
+                    m = k.other
+                    break
+            else:
+                if buf:
+                    sink(buf)
+                return (a, s, run_log(w))
+
+class RWSPure(RWS):
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+class RWSAsk(RWS):
+    __slots__ = ()
+
+    def __init__(self):
+        pass
+class RWSTell(RWS):
+    __slots__ = ('w',)
+
+    def __init__(self, w):
+        self.w = w
+class RWSGet(RWS):
+    __slots__ = ()
+
+    def __init__(self):
+        pass
+class RWSPut(RWS):
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+class RWSModify(RWS):
+    __slots__ = ('f',)
+
+    def __init__(self, f):
+        self.f = f
+
+class RWSBind(RWS):
+    '''
+    A suspended ~m.bind(f)~ -- interpreted by ~RWS.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+class RWSMap(RWS):
+    '''
+    A suspended ~m.fmap(f)~ -- interpreted by ~RWS.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+class RWSApp(RWS):
+    '''
+    A suspended ~m.app(other)~ -- interpreted by ~RWS.run~.
+    '''
+    __slots__ = ('m', 'other')
+
+    def __init__(self, m, other):
+        self.m = m
+        self.other = other
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+class RWSLocal(RWS):
+    '''
+    A suspended ~m.local(f)~ -- interpreted by ~RWS.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+class RWSListen(RWS):
+    '''
+    A suspended ~m.listen()~ -- interpreted by ~RWS.run~.
+    '''
+    __slots__ = ('m',)
+
+    def __init__(self, m):
+        self.m = m
+class RWSCensor(RWS):
+    '''
+    A suspended ~m.censor(f)~ -- interpreted by ~RWS.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+_SPINE = {RWSBind: 'f', RWSMap: 'f', RWSApp: 'other'}
+'''
+The nodes whose ~m~ runs first, and the name of their other field
+'''
+
+def _flush(sink, buf, batch_size):
+    '''
+    Gives the full batches in buf to the sink, leaving the rest in buf
+    '''
+    n = len(buf) - len(buf) % batch_size
+    for i in range(0, n, batch_size):
+        sink(buf[i:i + batch_size])
+    del buf[:n]
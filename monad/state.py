@@ -1,5 +1,11 @@
+import collections
+import itertools
+import operator
+import os
+
 from .monad import Monad
 from .unit import Unit
+from .nodes import Apply, reduce_spine
 
 class State(Monad):
     '''
@@ -8,32 +14,61 @@ class State(Monad):
     The state is s, and the computation's value is a
 
     The initial state "s" is given when ~state.run~ is called.
+
+    A State is a tree of nodes: either a primitive step (a function
+    s -> (a, s)), one of ~StatePure~, ~StateGet~, ~StatePut~ (and the other
+    primitives ~StateGets~, ~StateModify~, ~StateMutate~, ~StateSetItem~), or a
+    ~StateBind~/~StateMap~/~StateApp~ node. ~run~ walks the tree in a
+    loop, so long chains of binds don't grow the Python stack.
+
+    Apart from ~State(f)~ itself, the nodes hold no lambdas: a program built
+    from lift/get/put and module-level functions can be pickled (e.g. sent
+    to a ~ProcessPoolExecutor~) and run the same way on the other side.
     '''
+    __slots__ = ('step',)
+
     def __init__(self, run):
-        self.run = run
-        
+        self.step = run
+
     @staticmethod
     def lift(x):
-        return State(lambda s: (x, s))
+        return StatePure(x)
 
     def fmap(self, f):
-        def run(s):
-            (_a, _s) = self.run(s)
-            return (f(_a), _s)
-        return State(run)
+        return StateMap(self, f)
 
     def app(self, other):
-        def run(s):
-            (_f, _s1) = self.run(s)
-            (_a, _s2) = other.run(_s1)
-            return (_f(_a), _s2)
-        return State(run)
+        return StateApp(self, other)
 
     def bind(self, f):
-        def run(s):
-            (_a, _s) = self.run(s)
-            return f(_a).run(_s)
-        return State(run)
+        return StateBind(self, f)
+
+    def run(self, s):
+        '''
+        run :: State s a -> s -> (a, s)
+        Trampolined: runs in constant Python stack space for any chain of binds.
+        '''
+        return _run(self, [], s)
+
+    def run_many(self, states, executor=None, chunksize=1024, prefetch=None):
+        '''
+        run_many :: State s a -> [s] -> Iterator (a, s)
+        Runs the program from each of the initial states (any iterable), giving
+        an iterator of the results (in order) as they are computed. Each state is
+        a separate ~run~: the tree is walked again for every state (a bind can
+        build a different program for each one), so this saves no work over
+        calling ~run~ in a loop, apart from the executor below.
+
+        If an executor (e.g. a ~concurrent.futures.ProcessPoolExecutor~) is given,
+        the states are run in it in chunks of ~chunksize~ states; the program and
+        the states must be picklable. Chunks are only read from ~states~ as the
+        results are used, with at most ~prefetch~ chunks (by default two per CPU)
+        submitted ahead.
+        '''
+        if executor is None:
+            return map(self.run, states)
+        return _run_sharded(self, states, executor, chunksize,
+                            prefetch or 2 * (os.cpu_count() or 1))
 
     @staticmethod
     def put(x):
@@ -41,7 +76,7 @@ class State(Monad):
         put :: s -> State ()
         Set the state value
         '''
-        return State(lambda _: (Unit(), x))
+        return StatePut(x)
 
     @staticmethod
     def get():
@@ -49,4 +84,212 @@ class State(Monad):
         get :: State s
         Access the state value
         '''
-        return State(lambda s: (s, s))
+        return StateGet()
+
+    @staticmethod
+    def gets(f):
+        '''
+        gets :: (s -> a) -> State s a
+        Gives f applied to the state value
+        '''
+        return StateGets(f)
+
+    @staticmethod
+    def modify(f):
+        '''
+        modify :: (s -> s) -> State s ()
+        Maps f over the state value
+        '''
+        return StateModify(f)
+
+    @staticmethod
+    def mutate(f):
+        '''
+        mutate :: (s -> a) -> State s a
+        Calls f with the state value, which f may update in place (e.g.
+        ~lambda s: s.append(1)~). Gives the value f returns.
+        Can only be run by ~run_st~ (~run~ raises a RuntimeError), see there.
+        '''
+        return StateMutate(f)
+
+    @staticmethod
+    def setitem(key, x):
+        '''
+        setitem :: k -> v -> State s ()
+        ~s[key] = x~ in place. Can only be run by ~run_st~, like ~mutate~.
+        '''
+        return StateSetItem(key, x)
+
+    @staticmethod
+    def getitem(key):
+        '''
+        getitem :: k -> State s v
+        Gives ~s[key]~
+        '''
+        return StateGets(operator.itemgetter(key))
+
+    def run_st(self, new):
+        '''
+        run_st :: State s a -> (() -> s) -> a
+        Runs with a new state made by calling ~new()~ (e.g. ~dict~), and gives
+        only the value (like Haskell's ~runST~). The state doesn't leave this
+        call, so ~mutate~ and ~setitem~ can update it in place instead of
+        copying it, and running the program again starts from a fresh state.
+
+        A RuntimeError is raised if the value is the state itself. Values made
+        from the state (e.g. a list inside of it) should be copied by the
+        program (e.g. ~State.gets(lambda s: list(s['xs']))~).
+        '''
+        s = new()
+        a = _run(self, [], s, True)[0]
+        if a is s:
+            raise RuntimeError('run_st can\'t give its state as the value')
+        return a
+
+class StatePure(State):
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+class StateGet(State):
+    __slots__ = ()
+
+    def __init__(self):
+        pass
+class StatePut(State):
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+class StateGets(State):
+    __slots__ = ('f',)
+
+    def __init__(self, f):
+        self.f = f
+class StateModify(State):
+    __slots__ = ('f',)
+
+    def __init__(self, f):
+        self.f = f
+class StateMutate(State):
+    __slots__ = ('f',)
+
+    def __init__(self, f):
+        self.f = f
+class StateSetItem(State):
+    __slots__ = ('key', 'x')
+
+    def __init__(self, key, x):
+        self.key = key
+        self.x = x
+
+class StateBind(State):
+    '''
+    A suspended ~m.bind(f)~ -- interpreted by ~State.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+class StateMap(State):
+    '''
+    A suspended ~m.fmap(f)~ -- interpreted by ~State.run~.
+    '''
+    __slots__ = ('m', 'f')
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+class StateApp(State):
+    '''
+    A suspended ~m.app(other)~ -- interpreted by ~State.run~.
+    '''
+    __slots__ = ('m', 'other')
+
+    def __init__(self, m, other):
+        self.m = m
+        self.other = other
+
+    def __reduce__(self):
+        return reduce_spine(self, _SPINE)
+
+_SPINE = {StateBind: 'f', StateMap: 'f', StateApp: 'other'}
+'''
+The nodes whose ~m~ runs first, and the name of their other field
+'''
+
+def _run(m, konts, s, local=False):
+    '''
+    Runs ~m~ with the state s, then the continuations in ~konts~ (see ~State.run~).
+    ~local~ is True when s was made by ~run_st~ (so it can be updated in place).
+    '''
+    while True:
+        t = type(m)
+        if t in _SPINE:
+            konts.append(m)
+            m = m.m
+            continue
+        if t is StatePure:
+            a = m.x
+        elif t is StateGet:
+            a = s
+        elif t is StatePut:
+            a = Unit()
+            s = m.x
+        elif t is StateGets:
+            a = m.f(s)
+        elif t is StateMutate:
+            if not local:
+                raise RuntimeError('State.mutate can only be run by run_st')
+            a = m.f(s)
+        elif t is StateModify:
+            a = Unit()
+            s = m.f(s)
+        elif t is StateSetItem:
+            if not local:
+                raise RuntimeError('State.setitem can only be run by run_st')
+            a = Unit()
+            s[m.key] = m.x
+        else:
+            a, s = m.step(s)
+        while konts:
+            k = konts.pop()
+            t = type(k)
+            if t is StateMap or t is Apply:
+                a = k.f(a)
+            elif t is StateBind:
+                m = k.f(a)
+                break
+            else:
+                konts.append(Apply(a))
+                m = k.other
+                break
+        else:
+            return (a, s)
+
+def _run_sharded(m, states, executor, chunksize, prefetch):
+    pending = collections.deque()
+    for chunk in _chunks(states, chunksize):
+        pending.append(executor.submit(_run_chunk, m, chunk))
+        if len(pending) >= prefetch:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+def _run_chunk(m, states):
+    return [m.run(s) for s in states]
+
+def _chunks(xs, n):
+    xs = iter(xs)
+    while True:
+        chunk = list(itertools.islice(xs, n))
+        if not chunk:
+            return
+        yield chunk
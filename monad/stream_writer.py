@@ -0,0 +1,109 @@
+'''
+A Writer that sends its output to a sink while it runs, instead of keeping
+all of it until the end.
+
+    job = StreamWriter.tell(['start']).then(work).bind(lambda x: StreamWriter.tell(['done %s' % x]))
+    with open('audit.log', 'w') as f:
+        job.run(to_file(f), batch_size=10000)
+'''
+from .monad import Monad
+from .rws import RWS
+
+class StreamWriter(Monad):
+    '''
+    StreamWriter w a
+    Same as ~Writer~ with the (default) list monoid, but the program only runs
+    when ~run(sink)~ is called, and the entries that are told are given to
+    ~sink~ in batches as the program runs. Only a batch is kept in memory, apart
+    from the output inside a ~listen~ or ~censor~, which is kept until the end
+    of its scope (it is needed as a whole there).
+
+    A StreamWriter is an ~RWS~ program (~p~) that doesn't use the environment or
+    the state, run with a sink (see ~RWS.run~). So long chains of binds don't
+    grow the Python stack.
+    '''
+    __slots__ = ('p',)
+
+    def __init__(self, p):
+        self.p = p
+
+    @staticmethod
+    def lift(x):
+        return StreamWriter(RWS.lift(x))
+
+    @staticmethod
+    def tell(w):
+        '''
+        tell :: [w] -> StreamWriter w ()
+        Outputs each entry in the list w
+        '''
+        return StreamWriter(RWS.tell(w))
+
+    def fmap(self, f):
+        return StreamWriter(self.p.fmap(f))
+
+    def app(self, other):
+        return StreamWriter(self.p.app(other.p))
+
+    def bind(self, f):
+        return StreamWriter(self.p.bind(_Program(f)))
+
+    def listen(self):
+        '''
+        listen :: StreamWriter w a -> StreamWriter w (a, [w])
+        The output of self is also sent to the sink (at the end of the scope).
+        '''
+        return StreamWriter(self.p.listen())
+
+    def listens(self, f):
+        '''
+        listens :: StreamWriter w a -> ([w] -> b) -> StreamWriter w (a, b)
+        '''
+        return self.listen().fmap(lambda t: (t[0], f(t[1])))
+
+    def censor(self, f):
+        '''
+        censor :: StreamWriter w a -> ([w] -> [w]) -> StreamWriter w a
+        Runs self and maps f over its output before it is sent to the sink.
+        '''
+        return StreamWriter(self.p.censor(f))
+
+    def run(self, sink, batch_size=1024):
+        '''
+        run :: StreamWriter w a -> ([w] -> ()) -> Int -> a
+        Runs the program, calling ~sink~ with each batch (a list of at most
+        ~batch_size~ entries, in order). The last batch is given before ~run~
+        returns. ~sink~ can be any function of a list, like ~queue.put~ or
+        ~to_file(handle)~.
+        '''
+        return self.p.run(None, None, sink, batch_size)[0]
+
+    def collect(self, metric, batch_size=1024):
+        '''
+        collect :: StreamWriter w a -> Metric -> Int -> (a, m)
+        Runs the program with the numbers that are told accumulated by a metric
+        from ~monad.metrics~ (like ~Sum()~ or ~Histogram(lo, hi, bins)~), giving
+        the value and the metric's result. Use a new metric for each run.
+        '''
+        a = self.run(metric.add, batch_size)
+        return (a, metric.result())
+
+class _Program:
+    '''
+    A bind's function, giving the RWS program of the StreamWriter it returns
+    '''
+    __slots__ = ('f',)
+
+    def __init__(self, f):
+        self.f = f
+
+    def __call__(self, x):
+        return self.f(x).p
+
+def to_file(handle):
+    '''
+    A sink that writes each entry on its own line of a file
+    '''
+    def sink(batch):
+        handle.write(''.join('%s\n' % w for w in batch))
+    return sink
@@ -1,3 +1,18 @@
 class Unit:
+    '''
+    ()
+    There is only one Unit value, ~Unit()~ always gives the same instance.
+    '''
+    __slots__ = ()
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __eq__(self, other):
         return isinstance(other, Unit)
+
+    def __hash__(self):
+        return 0
@@ -1,17 +1,27 @@
+import functools
+import operator
+
 from .unit import Unit
 from .monad import Monad
 
 class Writer(Monad):
+    __slots__ = ('t',)
+
     def __init__(self, t):
         self.t = t
         '''
         A tuple of (x, w) -- for Python it might have been better to use a lambda.
         That way, "running" the monad makes more sense. You could control evaluation.
         This way, evaluation is immediate.
+
+        ~w~ is kept as a log: either a single monoid value, ~None~ (mempty) or a
+        ~LogCat~ of two logs. Appending to a log is O(1); the monoid values are
+        only combined (once) when the output is needed, see ~mconcat~. So ~t~
+        is internal: use ~run()~ to get the value and the output.
         '''
 
     @staticmethod
-    def lift(x, w=[]):
+    def lift(x, w=None):
         '''
         By default, this is a ListWriter monad, but you can pass w here to make use another type.
         (so long as that type works with __add__)
@@ -26,13 +36,14 @@ class Writer(Monad):
 
     def app(self, other):
         x, w = self.t
-        return other.fmap(x)
+        x2, w2 = other.t
+        return Writer((x(x2), log_append(w, w2)))
 
     def bind(self, f):
         x1, w1 = self.t
-        m = f(x1)        
+        m = f(x1)
         x2, w2 = m.t
-        return Writer((x2, w1 + w2))
+        return Writer((x2, log_append(w1, w2)))
 
     @staticmethod
     def tell(w):
@@ -45,7 +56,7 @@ class Writer(Monad):
         '''
         t, w = self.t
         x, f = t
-        return Writer((x, f(w)))
+        return Writer((x, f(run_log(w))))
 
     def censor(self, f):
         '''
@@ -54,10 +65,11 @@ class Writer(Monad):
         This is a helper to use the ~pass~ function without lifting tuples into a writer.
         '''
         x, w = self.t
-        return Writer((x, f)).wpass()
+        return Writer(((x, f), w)).wpass()
 
     def run(self):
-        return self.t
+        x, w = self.t
+        return (x, run_log(w))
 
     def listen(self):
         '''
@@ -66,7 +78,8 @@ class Writer(Monad):
 
         Executes the given writer, and gives access to the value and monoid in the returned writer.
         '''
-        x, w = self.t 
+        x, w = self.t
+        w = run_log(w)
         return Writer(((x, w), w))
 
     def listens(self, f):
@@ -75,4 +88,86 @@ class Writer(Monad):
         Maps a function over the writer's output value, and includes that in the next writer.
         I have the arguments flipped here, because Python always has ~self~ as the first argument in methods.
         '''
-        return self.listen().bind(lambda t: Writer.lift(t[0], f(t[1])))
+        return self.listen().fmap(lambda t: (t[0], f(t[1])))
+
+class LogCat:
+    '''
+    The concatenation of two logs (a node of a rope).
+    '''
+    __slots__ = ('left', 'right')
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def __reduce__(self):
+        # Pickled as a flat tuple of monoid values, so a deep rope doesn't
+        # exceed pickle's recursion limit.
+        return (_log_from_values, (tuple(log_values(self)),))
+
+def log_append(w1, w2):
+    '''
+    Appends two logs in O(1). ~None~ is the empty log.
+    '''
+    if w1 is None:
+        return w2
+    if w2 is None:
+        return w1
+    return LogCat(w1, w2)
+
+def mconcat(w):
+    '''
+    Combines all of the monoid values in a log (in order).
+    Lists are extended into one new list and strings are joined, so this is
+    linear in the size of the output. Any other type is combined with __add__.
+    Empty values (like ~''~ or ~[]~) are skipped; if every value is empty the
+    first one is given, and an empty log gives ~None~.
+    '''
+    if type(w) is not LogCat:
+        return w
+    ws = log_values(w)
+    nonempty = [x for x in ws if not _is_empty(x)]
+    if len(nonempty) < 2:
+        return nonempty[0] if nonempty else ws[0]
+    ws = nonempty
+    first = ws[0]
+    if isinstance(first, list):
+        out = []
+        for w in ws:
+            out.extend(w)
+        return out
+    if isinstance(first, str):
+        return ''.join(ws)
+    return functools.reduce(operator.add, ws)
+
+def run_log(w):
+    '''
+    The output of a log for ~run~: ~mconcat~, with the default monoid's
+    mempty (~[]~) for an empty log.
+    '''
+    w = mconcat(w)
+    return [] if w is None else w
+
+def _is_empty(w):
+    return hasattr(w, '__len__') and len(w) == 0
+
+def log_values(w):
+    '''
+    The monoid values in a log (in order)
+    '''
+    ws = []
+    stack = [w]
+    while stack:
+        w = stack.pop()
+        if type(w) is LogCat:
+            stack.append(w.right)
+            stack.append(w.left)
+        elif w is not None:
+            ws.append(w)
+    return ws
+
+def _log_from_values(ws):
+    w = None
+    for x in ws:
+        w = log_append(w, x)
+    return w
@@ -13,4 +13,5 @@ setuptools.setup(
     long_description_content_type="text/org",
     url="https://github.com/bergerab/monads-py",
     packages=setuptools.find_packages(),
+    extras_require={'numpy': ['numpy']},
     python_requires='>=3.6')